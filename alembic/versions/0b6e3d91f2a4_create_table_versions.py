@@ -0,0 +1,30 @@
+"""create table_versions
+
+Revision ID: 0b6e3d91f2a4
+Revises: f4a7c2e8d015
+Create Date: 2026-10-18 17:41:09.552870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e3d91f2a4'
+down_revision: Union[str, Sequence[str], None] = 'f4a7c2e8d015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(50), primary_key=True),
+        sa.Column('hotel_id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('version', sa.BigInteger, nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
@@ -0,0 +1,44 @@
+"""add status_rank to reservations
+
+Revision ID: 3f1c9d2b7a64
+Revises: a45c632f01eb
+Create Date: 2026-10-18 09:12:31.482910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9d2b7a64'
+down_revision: Union[str, Sequence[str], None] = 'a45c632f01eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # coluna VIRTUAL: o InnoDB adiciona sem reconstruir a tabela e permite indexá-la
+    op.add_column(
+        'reservations',
+        sa.Column(
+            'status_rank',
+            sa.SmallInteger(),
+            sa.Computed(
+                "CASE status WHEN 'booked' THEN 1 WHEN 'checked_in' THEN 2 "
+                "WHEN 'checked_out' THEN 3 WHEN 'canceled' THEN 4 ELSE 5 END",
+                persisted=False,
+            ),
+        ),
+    )
+    op.create_index(
+        'ix_reservations_status_rank_check_in_id',
+        'reservations',
+        ['status_rank', 'check_in', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_status_rank_check_in_id', table_name='reservations')
+    op.drop_column('reservations', 'status_rank')
@@ -0,0 +1,57 @@
+"""add hotel_id to reservations
+
+Revision ID: 5c2e7a1d9b43
+Revises: 0b6e3d91f2a4
+Create Date: 2026-10-18 18:31:09.640227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e7a1d9b43'
+down_revision: Union[str, Sequence[str], None] = '0b6e3d91f2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # cópia do hotel do quarto: a lista de reservas filtra e ordena por hotel no mesmo índice,
+    # sem percorrer as reservas dos outros hotéis pelo join com rooms
+    op.add_column('reservations', sa.Column('hotel_id', sa.Integer, nullable=True))
+
+    # preenche em faixas da chave primária
+    conn = op.get_bind()
+    max_id = conn.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM reservations")).scalar()
+    for low in range(0, max_id, BATCH_SIZE):
+        conn.execute(
+            sa.text(
+                "UPDATE reservations JOIN rooms ON rooms.id = reservations.room_id "
+                "SET reservations.hotel_id = rooms.hotel_id "
+                "WHERE reservations.id > :low AND reservations.id <= :high"
+            ),
+            {"low": low, "high": low + BATCH_SIZE},
+        )
+
+    op.alter_column('reservations', 'hotel_id', existing_type=sa.Integer, nullable=False)
+    op.create_foreign_key(
+        'fk_reservations_hotel_id', 'reservations', 'hotels', ['hotel_id'], ['id'], ondelete="CASCADE"
+    )
+    op.execute("""
+        CREATE INDEX ix_reservations_hotel_id_status_rank_check_in_id
+        ON reservations (hotel_id, status_rank, check_in, id)
+        ALGORITHM=INPLACE LOCK=NONE
+    """)
+    # a ordenação global só servia à lista de reservas, que agora é sempre por hotel
+    op.execute("DROP INDEX ix_reservations_status_rank_check_in_id ON reservations ALGORITHM=INPLACE LOCK=NONE")
+
+
+def downgrade() -> None:
+    op.create_index('ix_reservations_status_rank_check_in_id', 'reservations', ['status_rank', 'check_in', 'id'])
+    op.drop_index('ix_reservations_hotel_id_status_rank_check_in_id', table_name='reservations')
+    op.drop_constraint('fk_reservations_hotel_id', 'reservations', type_='foreignkey')
+    op.drop_column('reservations', 'hotel_id')
@@ -0,0 +1,48 @@
+"""add composite indexes for tenant scoped queries
+
+Revision ID: b7e2a9c41d05
+Revises: 3f1c9d2b7a64
+Create Date: 2026-10-18 10:40:05.219774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2a9c41d05'
+down_revision: Union[str, Sequence[str], None] = '3f1c9d2b7a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nome, tabela, colunas) -- cada índice segue o formato das consultas nos routers/helpers
+INDEXES = [
+    # verify_guest_by_cpf, create_guest, /api/get_guests
+    ('ix_guests_hotel_id_cpf', 'guests', ['hotel_id', 'cpf']),
+    # lista de hóspedes (hotel + não apagados)
+    ('ix_guests_hotel_id_is_deleted', 'guests', ['hotel_id', 'is_deleted']),
+    # create_room (número repetido) e lista de quartos
+    ('ix_rooms_hotel_id_room_number', 'rooms', ['hotel_id', 'room_number']),
+    ('ix_rooms_hotel_id_status', 'rooms', ['hotel_id', 'status']),
+    # disponibilidade de quartos e reservas ativas por quarto
+    ('ix_reservations_room_id_status_check_in', 'reservations', ['room_id', 'status', 'check_in', 'check_out']),
+    # conflito do hóspede e próxima estadia na lista de hóspedes
+    ('ix_reservations_guest_id_status_check_in', 'reservations', ['guest_id', 'status', 'check_in', 'check_out']),
+]
+
+
+def upgrade() -> None:
+    # ALGORITHM=INPLACE, LOCK=NONE: o InnoDB cria o índice sem bloquear leituras e escritas
+    for name, table, columns in INDEXES:
+        op.execute(f"""
+            CREATE INDEX {name} ON {table} ({', '.join(columns)})
+            ALGORITHM=INPLACE LOCK=NONE
+        """)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        op.execute(f"DROP INDEX {name} ON {table} ALGORITHM=INPLACE LOCK=NONE")
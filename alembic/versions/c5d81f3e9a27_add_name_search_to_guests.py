@@ -0,0 +1,56 @@
+"""add name_search fulltext index to guests
+
+Revision ID: c5d81f3e9a27
+Revises: b7e2a9c41d05
+Create Date: 2026-10-18 13:05:48.906132
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81f3e9a27'
+down_revision: Union[str, Sequence[str], None] = 'b7e2a9c41d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _normalize(s):
+    # mesma regra de app.utils.text_search.normalize_text no momento da migração
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", s.lower()).split())
+
+
+def upgrade() -> None:
+    op.add_column('guests', sa.Column('name_search', sa.String(100), nullable=True))
+
+    # preenche em lotes pela chave primária para não travar a tabela inteira
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, name FROM guests WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE guests SET name_search = :name_search WHERE id = :id"),
+            [{"id": row.id, "name_search": _normalize(row.name)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.execute("CREATE FULLTEXT INDEX ix_guests_name_search ON guests (name_search)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_guests_name_search', table_name='guests')
+    op.drop_column('guests', 'name_search')
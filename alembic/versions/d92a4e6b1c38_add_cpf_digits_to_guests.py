@@ -0,0 +1,90 @@
+"""add cpf_digits to guests
+
+Revision ID: d92a4e6b1c38
+Revises: c5d81f3e9a27
+Create Date: 2026-10-18 14:22:17.530861
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92a4e6b1c38'
+down_revision: Union[str, Sequence[str], None] = 'c5d81f3e9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+MAX_REPORTED_DUPLICATES = 50
+
+
+def _duplicate_cpfs(conn) -> list:
+    """Guests of the same hotel whose CPFs differ only in formatting, as (hotel_id, digits, ids)."""
+    seen, duplicates = {}, {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, hotel_id, cpf FROM guests WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            key = (row.hotel_id, re.sub(r'\D', '', row.cpf or ''))
+            if key in seen:
+                duplicates.setdefault(key, [seen[key]]).append(row.id)
+            else:
+                seen[key] = row.id
+        last_id = rows[-1].id
+    return [(hotel_id, digits, ids) for (hotel_id, digits), ids in duplicates.items()]
+
+
+def upgrade() -> None:
+    # o índice único abaixo falharia com a migração pela metade (DDL do MySQL não volta atrás):
+    # confere antes de alterar a tabela
+    duplicates = _duplicate_cpfs(op.get_bind())
+    if duplicates:
+        lines = [f"  hotel {hotel_id}, CPF {digits or '(vazio)'}: hóspedes {', '.join(map(str, ids))}"
+                 for hotel_id, digits, ids in duplicates[:MAX_REPORTED_DUPLICATES]]
+        if len(duplicates) > MAX_REPORTED_DUPLICATES:
+            lines.append(f"  ... e mais {len(duplicates) - MAX_REPORTED_DUPLICATES}")
+        raise RuntimeError(
+            f"{len(duplicates)} CPF(s) repetidos no mesmo hotel, com e sem formatação. "
+            "Una ou remova os cadastros abaixo e rode a migração de novo:\n" + "\n".join(lines)
+        )
+
+    op.add_column('guests', sa.Column('cpf_digits', sa.String(11), nullable=True))
+
+    # preenche em lotes pela chave primária
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, cpf FROM guests WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE guests SET cpf_digits = :cpf_digits WHERE id = :id"),
+            [{"id": row.id, "cpf_digits": re.sub(r'\D', '', row.cpf or '')} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('guests', 'cpf_digits', existing_type=sa.String(11), nullable=False)
+    op.create_index('ux_guests_hotel_id_cpf_digits', 'guests', ['hotel_id', 'cpf_digits'], unique=True)
+    # as buscas por CPF passam a usar cpf_digits: o índice pelo CPF formatado fica sem uso
+    op.execute("DROP INDEX ix_guests_hotel_id_cpf ON guests ALGORITHM=INPLACE LOCK=NONE")
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE INDEX ix_guests_hotel_id_cpf ON guests (hotel_id, cpf)
+        ALGORITHM=INPLACE LOCK=NONE
+    """)
+    op.drop_index('ux_guests_hotel_id_cpf_digits', table_name='guests')
+    op.drop_column('guests', 'cpf_digits')
@@ -0,0 +1,68 @@
+"""create daily_occupancy rollup
+
+Revision ID: f4a7c2e8d015
+Revises: d92a4e6b1c38
+Create Date: 2026-10-18 16:05:42.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7c2e8d015'
+down_revision: Union[str, Sequence[str], None] = 'd92a4e6b1c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# a mesma regra de add_stay (app/helpers/reports/daily_occupancy.py): ceil(dias) diárias a partir
+# da data do check-in, "booked" conta como reservada, os demais status não cancelados como ocupada
+BACKFILL_SQL = """
+    INSERT INTO daily_occupancy (hotel_id, date, room_type, occupied, booked, revenue)
+    SELECT rooms.hotel_id,
+           DATE(reservations.check_in) + INTERVAL nights.n DAY,
+           rooms.type,
+           SUM(reservations.status <> 'booked'),
+           SUM(reservations.status = 'booked'),
+           SUM(COALESCE(ROUND(rooms.price, 2), 0))
+    FROM reservations
+    JOIN rooms ON rooms.id = reservations.room_id
+    JOIN _rollup_nights AS nights
+      ON nights.n < CEIL(TIMESTAMPDIFF(SECOND, reservations.check_in, reservations.check_out) / 86400)
+    WHERE rooms.hotel_id = :hotel_id
+      AND reservations.status <> 'canceled'
+      AND reservations.check_in IS NOT NULL
+      AND reservations.check_out IS NOT NULL
+    GROUP BY rooms.hotel_id, DATE(reservations.check_in) + INTERVAL nights.n DAY, rooms.type
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_occupancy',
+        sa.Column('hotel_id', sa.Integer, sa.ForeignKey('hotels.id', ondelete="CASCADE"), primary_key=True),
+        sa.Column('date', sa.Date, primary_key=True),
+        sa.Column('room_type', sa.String(50), primary_key=True),
+        sa.Column('occupied', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('booked', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(12, 2), nullable=False, server_default='0'),
+    )
+
+    # carga inicial: sem ela os deltas das reservas que já existem deixariam o rollup negativo
+    conn = op.get_bind()
+    max_nights = conn.execute(sa.text(
+        "SELECT COALESCE(MAX(CEIL(TIMESTAMPDIFF(SECOND, check_in, check_out) / 86400)), 0) "
+        "FROM reservations WHERE status <> 'canceled'"
+    )).scalar()
+    conn.execute(sa.text("CREATE TEMPORARY TABLE _rollup_nights (n INT PRIMARY KEY)"))
+    if max_nights > 0:
+        conn.execute(sa.text("INSERT INTO _rollup_nights (n) VALUES (:n)"), [{"n": n} for n in range(int(max_nights))])
+    # um hotel por vez, para não montar a agregação da tabela inteira num único INSERT
+    for hotel_id in conn.execute(sa.text("SELECT id FROM hotels ORDER BY id")).scalars().all():
+        conn.execute(sa.text(BACKFILL_SQL), {"hotel_id": hotel_id})
+    conn.execute(sa.text("DROP TEMPORARY TABLE _rollup_nights"))
+
+
+def downgrade() -> None:
+    op.drop_table('daily_occupancy')
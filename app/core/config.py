@@ -1,7 +1,10 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 import urllib.parse
 
 load_dotenv()
@@ -11,8 +14,125 @@ DB_PASSWORD = urllib.parse.quote_plus(os.getenv("DB_PASSWORD", "password"))
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME", "roomcontrol")
 
-SQLALCHEMY_DATABASE_URL = f"mysql+mysqldb://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+# DATABASE_URL substitui a URL montada acima (ex. o banco descartável dos benchmarks)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+mysqldb://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+#CONFIGURAÇÃO DO POOL DE CONEXÕES
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+# tempo máximo (ms) de cada SELECT no MySQL, 0 desativa
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class _PoolMetrics:
+    """Counters fed by the pool events below."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.born = {}
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+
+pool_metrics = _PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that measures how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with pool_metrics.lock:
+                pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    connect_args = {}
+    if url.startswith("mysql"):
+        connect_args["connect_timeout"] = DB_CONNECT_TIMEOUT
+        if DB_STATEMENT_TIMEOUT_MS:
+            connect_args["init_command"] = f"SET SESSION max_execution_time={DB_STATEMENT_TIMEOUT_MS}"
+    elif url.startswith("sqlite"):
+        # as rotas síncronas rodam no threadpool
+        connect_args["check_same_thread"] = False
+
+    db_engine = create_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+    @event.listens_for(db_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with pool_metrics.lock:
+            pool_metrics.born[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(db_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        with pool_metrics.lock:
+            pool_metrics.born.pop(id(connection_record), None)
+
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def pool_stats() -> dict:
+    """Snapshot of the connection pool usage."""
+    pool = engine.pool
+    now = time.monotonic()
+    with pool_metrics.lock:
+        ages = [now - born for born in pool_metrics.born.values()]
+        checkouts = pool_metrics.checkouts
+        wait_total = pool_metrics.wait_total
+        wait_max = pool_metrics.wait_max
+        timeouts = pool_metrics.timeouts
+
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "connections": len(ages),
+        "checkouts": checkouts,
+        "checkout_timeouts": timeouts,
+        "wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_max_ms": round(wait_max * 1000, 3),
+        "connection_age_avg_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+        "connection_age_max_s": round(max(ages), 1) if ages else 0.0,
+    }
@@ -1,10 +1,18 @@
 from itsdangerous import URLSafeTimedSerializer
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+import asyncio
 import os
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# custo do bcrypt: hashes com custo diferente são atualizados no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# "process" usa todos os núcleos; "thread" serve para ambientes sem fork/spawn
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret_key")
 ALGORITHM = "HS256"
@@ -29,6 +37,36 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    # retorna (senha_confere, novo_hash ou None)
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+#POOL DE HASH (bcrypt bloqueia ~250ms, não pode rodar no event loop)
+_hash_executor = None
+
+def _get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        if PASSWORD_HASH_EXECUTOR == "thread":
+            _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+        else:
+            _hash_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _hash_executor
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_and_update_password, plain_password, hashed_password)
+
 #CONFIGURAÇÃO DE TOKEN JWT
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
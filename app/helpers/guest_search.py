@@ -0,0 +1,52 @@
+from sqlalchemy import and_, false, literal
+from sqlalchemy.dialects.mysql import match
+
+from app.models.guest import Guest
+from app.utils.text_search import tokenize
+
+# o InnoDB não indexa termos menores que innodb_ft_min_token_size (padrão 3)
+FT_MIN_TOKEN_SIZE = 3
+MAX_SEARCH_RESULTS = 50
+
+
+def _boolean_query(tokens):
+    # todos os termos obrigatórios, com busca por prefixo: "+ana* +silv*"
+    return " ".join(f"+{t}*" for t in tokens if len(t) >= FT_MIN_TOKEN_SIZE)
+
+
+def guest_name_filter(term: str):
+    """WHERE clause matching guests whose name contains every token (by prefix).
+
+    A term with no tokens (only punctuation) matches nothing, not every guest.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return false()
+    clauses = []
+    boolean_query = _boolean_query(tokens)
+    if boolean_query:
+        clauses.append(match(Guest.name_search, against=boolean_query).in_boolean_mode())
+    # termos curtos demais para o índice FULLTEXT: prefixo de alguma palavra
+    for t in tokens:
+        if len(t) < FT_MIN_TOKEN_SIZE:
+            clauses.append(
+                (Guest.name_search.like(f"{t}%")) | (Guest.name_search.like(f"% {t}%"))
+            )
+    return and_(*clauses)
+
+
+def guest_name_rank(term: str):
+    """Relevance score of the FULLTEXT match, for ORDER BY ... DESC."""
+    boolean_query = _boolean_query(tokenize(term))
+    if not boolean_query:
+        return literal(0)
+    return match(Guest.name_search, against=boolean_query).in_boolean_mode()
+
+
+def search_guests(query, term: str, limit: int = MAX_SEARCH_RESULTS):
+    """Filter `query` by guest name and return the best ranked rows."""
+    limit = max(1, min(limit or MAX_SEARCH_RESULTS, MAX_SEARCH_RESULTS))
+    return query.filter(guest_name_filter(term)) \
+        .order_by(guest_name_rank(term).desc(), Guest.name) \
+        .limit(limit) \
+        .all()
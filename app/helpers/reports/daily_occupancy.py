@@ -0,0 +1,210 @@
+import argparse
+import datetime
+import sys
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy.dialects.mysql import insert
+
+from app.core.config import SessionLocal
+from app.models.daily_occupancy import DailyOccupancy
+from app.models.hotel import Hotel
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms
+from app.helpers.reservations.price_calculator import stay_days
+
+OCCUPIED_STATUSES = ('checked_in', 'checked_out')
+UPSERT_BATCH_SIZE = 1000
+
+_CENT = Decimal("0.01")
+
+
+def _price(price) -> Decimal:
+    return Decimal(str(price or 0)).quantize(_CENT)
+
+
+def stay_snapshot(reservation):
+    """State of a reservation that the rollup depends on, taken before it is changed."""
+    return (reservation.status, reservation.check_in, reservation.check_out)
+
+
+def add_stay(deltas, hotel_id, room_type, price, status, check_in, check_out, sign=1):
+    """Accumulate into `deltas` the nights of one stay (sign=-1 removes them).
+
+    Each stay is charged ceil(days) nights from its check-in date, the same rule as
+    calc_price and the occupancy report. Canceled reservations count nothing.
+    """
+    if status == 'canceled' or not check_in or not check_out:
+        return deltas
+    column = 1 if status == 'booked' else 0
+    night_price = _price(price) * sign
+    first = check_in.date()
+    for i in range(stay_days(check_in, check_out)):
+        key = (hotel_id, first + datetime.timedelta(days=i), room_type)
+        entry = deltas[key]
+        entry[column] += sign
+        entry[2] += night_price
+    return deltas
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0, Decimal(0)])
+
+
+def apply_deltas(db, deltas):
+    """Upsert the accumulated deltas in the current transaction (the caller commits)."""
+    rows = [
+        {"hotel_id": h, "date": d, "room_type": t, "occupied": o, "booked": b, "revenue": r}
+        for (h, d, t), (o, b, r) in deltas.items()
+        if o or b or r
+    ]
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(DailyOccupancy).values(rows[i:i + UPSERT_BATCH_SIZE])
+        db.execute(stmt.on_duplicate_key_update(
+            occupied=DailyOccupancy.occupied + stmt.inserted.occupied,
+            booked=DailyOccupancy.booked + stmt.inserted.booked,
+            revenue=DailyOccupancy.revenue + stmt.inserted.revenue,
+        ))
+
+
+def record_stay_change(db, room, before, reservation):
+    """Move a reservation's nights from its `before` snapshot (None if new) to its current state."""
+    deltas = new_deltas()
+    if before is not None:
+        add_stay(deltas, room.hotel_id, room.type, room.price, *before, sign=-1)
+    add_stay(deltas, room.hotel_id, room.type, room.price, *stay_snapshot(reservation))
+    apply_deltas(db, deltas)
+
+
+def _room_stays(db, room_id):
+    return db.query(Reservations.status, Reservations.check_in, Reservations.check_out) \
+        .filter(Reservations.room_id == room_id) \
+        .filter(Reservations.status != 'canceled') \
+        .all()
+
+
+def record_room_change(db, room, old_type, old_price):
+    """Re-attribute a room's stays after its type or price changed."""
+    if old_type == room.type and _price(old_price) == _price(room.price):
+        return
+    deltas = new_deltas()
+    for stay in _room_stays(db, room.id):
+        add_stay(deltas, room.hotel_id, old_type, old_price, *stay, sign=-1)
+        add_stay(deltas, room.hotel_id, room.type, room.price, *stay)
+    apply_deltas(db, deltas)
+
+
+def record_room_removal(db, room):
+    """Remove a room's stays, before the room (and its reservations) is deleted."""
+    deltas = new_deltas()
+    for stay in _room_stays(db, room.id):
+        add_stay(deltas, room.hotel_id, room.type, room.price, *stay, sign=-1)
+    apply_deltas(db, deltas)
+
+
+def compute_rollup(db, hotel_id) -> dict:
+    """Recompute a hotel's rollup from scratch: {(hotel_id, date, type): [occupied, booked, revenue]}."""
+    stays = db.query(Rooms.type, Rooms.price, Reservations.status, Reservations.check_in, Reservations.check_out) \
+        .join(Rooms, Rooms.id == Reservations.room_id) \
+        .filter(Rooms.hotel_id == hotel_id) \
+        .filter(Reservations.status != 'canceled') \
+        .yield_per(5000)
+    deltas = new_deltas()
+    for stay in stays:
+        add_stay(deltas, hotel_id, *stay)
+    return {key: value for key, value in deltas.items() if any(value)}
+
+
+def stored_rollup(db, hotel_id) -> dict:
+    rows = db.query(DailyOccupancy).filter(DailyOccupancy.hotel_id == hotel_id).all()
+    return {
+        (row.hotel_id, row.date, row.room_type): [row.occupied, row.booked, _price(row.revenue)]
+        for row in rows
+        if row.occupied or row.booked or row.revenue
+    }
+
+
+def verify_rollup(db, hotel_id) -> list:
+    """Differences between the stored rollup and a full recomputation, as (key, stored, expected)."""
+    expected = compute_rollup(db, hotel_id)
+    stored = stored_rollup(db, hotel_id)
+    diffs = []
+    for key in sorted(expected.keys() | stored.keys()):
+        if expected.get(key) != stored.get(key):
+            diffs.append((key, stored.get(key), expected.get(key)))
+    return diffs
+
+
+def rebuild_rollup(db, hotel_id) -> int:
+    """Replace a hotel's rollup with a full recomputation. Returns the number of rows written."""
+    rollup = compute_rollup(db, hotel_id)
+    db.query(DailyOccupancy).filter(DailyOccupancy.hotel_id == hotel_id).delete(synchronize_session=False)
+    apply_deltas(db, rollup)
+    db.commit()
+    return len(rollup)
+
+
+def rollup_range(db, hotel_id, start: datetime.date, end: datetime.date):
+    """Stored rollup rows of a hotel for [start, end), ordered by date."""
+    return db.query(DailyOccupancy) \
+        .filter(DailyOccupancy.hotel_id == hotel_id) \
+        .filter(DailyOccupancy.date >= start) \
+        .filter(DailyOccupancy.date < end) \
+        .order_by(DailyOccupancy.date, DailyOccupancy.room_type) \
+        .all()
+
+
+def rollup_summary(db, hotel_id, start: datetime.date, end: datetime.date) -> dict:
+    """Occupancy and revenue for [start, end) read from the rollup, O(days x room types)."""
+    rooms = db.query(Rooms.id).filter(Rooms.hotel_id == hotel_id).count()
+    occupied = booked = 0
+    revenue = Decimal(0)
+    for row in rollup_range(db, hotel_id, start, end):
+        occupied += row.occupied
+        booked += row.booked
+        revenue += row.revenue
+    available = rooms * (end - start).days
+    nights = occupied + booked
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "rooms": rooms,
+        "occupied_nights": occupied,
+        "booked_nights": booked,
+        "revenue": float(revenue),
+        "occupancy": round(nights / available, 4) if available else 0.0,
+        "adr": round(float(revenue) / nights, 2) if nights else 0.0,
+        "revpar": round(float(revenue) / available, 2) if available else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.helpers.reports.daily_occupancy",
+        description="Recalcula ou confere a tabela daily_occupancy a partir das reservas.",
+    )
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--hotel-id", type=int, action="append", help="hotel a processar (padrão: todos)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        hotel_ids = args.hotel_id or [row.id for row in db.query(Hotel.id).order_by(Hotel.id)]
+        mismatches = 0
+        for hotel_id in hotel_ids:
+            if args.command == "rebuild":
+                print(f"hotel {hotel_id}: {rebuild_rollup(db, hotel_id)} linhas")
+                continue
+            diffs = verify_rollup(db, hotel_id)
+            mismatches += len(diffs)
+            print(f"hotel {hotel_id}: {len(diffs)} divergências")
+            for (_, date, room_type), stored, expected in diffs:
+                print(f"  {date} tipo {room_type}: gravado={stored} esperado={expected}")
+            db.rollback()
+    finally:
+        db.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import datetime
+import os
+
+from sqlalchemy import and_, case, event, func, or_
+
+from app.models.daily_occupancy import DailyOccupancy
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms
+from app.utils.ttl_cache import TTLCache
+
+# os indicadores do dia mudam a cada check-in/check-out; o cache é curto e invalidado nas escritas
+kpi_cache = TTLCache(ttl=float(os.getenv("DASHBOARD_KPI_CACHE_TTL", "15")))
+
+ROOM_STATUSES = ('available', 'occupied', 'maintenance')
+
+
+def invalidate_kpis(hotel_id):
+    kpi_cache.invalidate(hotel_id)
+
+
+@event.listens_for(Rooms, "after_insert")
+@event.listens_for(Rooms, "after_update")
+@event.listens_for(Rooms, "after_delete")
+def _invalidate_on_room_change(mapper, connection, target):
+    invalidate_kpis(target.hotel_id)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_kpis(db, hotel_id, today: datetime.date) -> dict:
+    """Today's desk indicators for a hotel, from three aggregate queries."""
+    day_start = datetime.datetime.combine(today, datetime.time.min)
+    day_end = day_start + datetime.timedelta(days=1)
+    checks_in_today = and_(Reservations.check_in >= day_start, Reservations.check_in < day_end)
+    checks_out_today = and_(Reservations.check_out >= day_start, Reservations.check_out < day_end)
+
+    # hospedagens em curso e reservas que tocam o dia de hoje, pelo índice (room_id, status, check_in, check_out)
+    stays = db.query(
+        _count_if(and_(Reservations.status == 'booked', checks_in_today)).label("arrivals_pending"),
+        _count_if(and_(Reservations.status == 'checked_in', checks_in_today)).label("arrivals_done"),
+        _count_if(and_(Reservations.status == 'checked_in', checks_out_today)).label("departures_pending"),
+        _count_if(and_(Reservations.status == 'checked_out', checks_out_today)).label("departures_done"),
+        _count_if(Reservations.status == 'checked_in').label("in_house"),
+        _count_if(and_(Reservations.status == 'checked_in', Reservations.check_out < day_start)).label("overdue"),
+    ) \
+        .join(Rooms, Rooms.id == Reservations.room_id) \
+        .filter(Rooms.hotel_id == hotel_id) \
+        .filter(or_(
+            Reservations.status == 'checked_in',
+            and_(
+                Reservations.status.in_(('booked', 'checked_out')),
+                Reservations.check_in < day_end,
+                Reservations.check_out >= day_start,
+            ),
+        )) \
+        .one()
+
+    rooms = {status: 0 for status in ROOM_STATUSES}
+    for status, total in db.query(Rooms.status, func.count(Rooms.id)) \
+            .filter(Rooms.hotel_id == hotel_id) \
+            .group_by(Rooms.status):
+        rooms[status] = total
+
+    month_start = today.replace(day=1)
+    revenue = db.query(
+        func.coalesce(func.sum(case((DailyOccupancy.date >= month_start, DailyOccupancy.revenue), else_=0)), 0),
+        func.coalesce(func.sum(DailyOccupancy.revenue), 0),
+    ) \
+        .filter(DailyOccupancy.hotel_id == hotel_id) \
+        .filter(DailyOccupancy.date >= today.replace(month=1, day=1)) \
+        .filter(DailyOccupancy.date <= today) \
+        .one()
+
+    total_rooms = sum(rooms.values())
+    return {
+        "date": today.isoformat(),
+        "arrivals": {"pending": int(stays.arrivals_pending), "done": int(stays.arrivals_done)},
+        "departures": {"pending": int(stays.departures_pending), "done": int(stays.departures_done)},
+        "in_house": int(stays.in_house),
+        "overdue": int(stays.overdue),
+        "rooms": {**rooms, "total": total_rooms},
+        "occupancy": round(rooms['occupied'] / total_rooms, 4) if total_rooms else 0.0,
+        "revenue": {"month_to_date": float(revenue[0]), "year_to_date": float(revenue[1])},
+    }
+
+
+def get_dashboard_kpis(db, hotel_id) -> dict:
+    today = datetime.date.today()
+    kpis = kpi_cache.get(hotel_id)
+    if kpis is None or kpis["date"] != today.isoformat():
+        kpis = compute_kpis(db, hotel_id, today)
+        kpi_cache.set(hotel_id, kpis)
+    return kpis
@@ -0,0 +1,149 @@
+import datetime
+import numpy as np
+
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms
+from app.helpers.reservations.price_calculator import SECONDS_PER_DAY
+
+MAX_REPORT_DAYS = 731
+
+ROOM_TYPE_LABELS = {
+    "1": "Solteiro",
+    "2": "Duplo (1 adulto, 1 criança)",
+    "3": "Duplo (2 adultos)",
+    "4": "Casal",
+    "5": "Triplo (1 adulto, 2 crianças)",
+    "6": "Triplo (2 adultos, 1 criança)",
+    "7": "Triplo (3 adultos)",
+    "8": "Triplo com casal",
+    "9": "Personalizado",
+}
+
+
+def load_report_arrays(db, hotel_id, start: datetime.date, end: datetime.date):
+    """Rooms and non-canceled stays of a hotel overlapping [start, end), as NumPy arrays."""
+    rooms = db.query(Rooms.id, Rooms.type, Rooms.price) \
+        .filter(Rooms.hotel_id == hotel_id) \
+        .order_by(Rooms.id) \
+        .all()
+
+    start_dt = datetime.datetime.combine(start, datetime.time.min)
+    end_dt = datetime.datetime.combine(end, datetime.time.min)
+    stays = db.query(Reservations.room_id, Reservations.check_in, Reservations.check_out) \
+        .join(Rooms, Rooms.id == Reservations.room_id) \
+        .filter(Rooms.hotel_id == hotel_id) \
+        .filter(Reservations.status != 'canceled') \
+        .filter(Reservations.check_in < end_dt) \
+        .filter(Reservations.check_out > start_dt - datetime.timedelta(days=1)) \
+        .all()
+
+    room_ids = np.fromiter((r.id for r in rooms), dtype=np.int64, count=len(rooms))
+    room_types = np.array([r.type for r in rooms], dtype=object)
+    room_prices = np.fromiter((r.price or 0.0 for r in rooms), dtype=np.float64, count=len(rooms))
+
+    stay_room = np.fromiter((s.room_id for s in stays), dtype=np.int64, count=len(stays))
+    stay_in = np.array([s.check_in for s in stays], dtype="datetime64[s]")
+    stay_out = np.array([s.check_out for s in stays], dtype="datetime64[s]")
+    return room_ids, room_types, room_prices, stay_room, stay_in, stay_out
+
+
+def compute_occupancy_report(room_ids, room_types, room_prices, stay_room, stay_in, stay_out,
+                             start: datetime.date, end: datetime.date) -> dict:
+    """Daily occupancy, ADR, RevPAR and revenue per room type, without per-row loops.
+
+    Each stay is charged ceil(days) nights from its check-in date, the same rule as
+    calc_price; every charged night adds one occupied room and the room price to that
+    date. Nights are accumulated with difference arrays (+1 at the first night, -1 after
+    the last) and a cumulative sum.
+    """
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D"))
+    n_days = len(days)
+    n_rooms = len(room_ids)
+
+    types, type_of_room = np.unique(room_types.astype(str), return_inverse=True) if n_rooms else (np.array([], dtype=str), np.array([], dtype=np.int64))
+    n_types = len(types)
+
+    # quarto de cada estadia -> posição no array de quartos
+    room_pos = np.searchsorted(room_ids, stay_room)
+    known = (room_pos < n_rooms) & (room_ids[np.minimum(room_pos, max(n_rooms - 1, 0))] == stay_room) if n_rooms else np.zeros(len(stay_room), dtype=bool)
+    room_pos, stay_in, stay_out = room_pos[known], stay_in[known], stay_out[known]
+
+    seconds = (stay_out - stay_in).astype(np.int64)
+    nights = np.ceil(seconds / SECONDS_PER_DAY).astype(np.int64)
+    first = (stay_in.astype("datetime64[D]") - days[0]).astype(np.int64) if n_days else np.zeros(0, dtype=np.int64)
+    last = first + nights
+    valid = nights > 0
+    first = np.clip(first[valid], 0, n_days)
+    last = np.clip(last[valid], 0, n_days)
+    stay_type = type_of_room[room_pos[valid]]
+    stay_price = room_prices[room_pos[valid]]
+
+    occupied_diff = np.zeros((n_types, n_days + 1), dtype=np.int64)
+    revenue_diff = np.zeros((n_types, n_days + 1), dtype=np.float64)
+    np.add.at(occupied_diff, (stay_type, first), 1)
+    np.add.at(occupied_diff, (stay_type, last), -1)
+    np.add.at(revenue_diff, (stay_type, first), stay_price)
+    np.add.at(revenue_diff, (stay_type, last), -stay_price)
+    occupied_by_type = np.cumsum(occupied_diff, axis=1)[:, :n_days]
+    revenue_by_type = np.cumsum(revenue_diff, axis=1)[:, :n_days]
+
+    rooms_by_type = np.bincount(type_of_room, minlength=n_types) if n_rooms else np.zeros(0, dtype=np.int64)
+    occupied = occupied_by_type.sum(axis=0)
+    revenue = revenue_by_type.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        occupancy = np.where(n_rooms, occupied / max(n_rooms, 1), 0.0)
+        adr = np.where(occupied > 0, revenue / np.maximum(occupied, 1), 0.0)
+        revpar = np.where(n_rooms, revenue / max(n_rooms, 1), 0.0)
+
+        type_nights = occupied_by_type.sum(axis=1)
+        type_revenue = revenue_by_type.sum(axis=1)
+        type_available = rooms_by_type * n_days
+        type_occupancy = np.where(type_available > 0, type_nights / np.maximum(type_available, 1), 0.0)
+        type_adr = np.where(type_nights > 0, type_revenue / np.maximum(type_nights, 1), 0.0)
+        type_revpar = np.where(type_available > 0, type_revenue / np.maximum(type_available, 1), 0.0)
+
+    total_nights = int(occupied.sum())
+    total_revenue = float(revenue.sum())
+    available_nights = n_rooms * n_days
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "rooms": n_rooms,
+        "totals": {
+            "room_nights": total_nights,
+            "available_nights": available_nights,
+            "revenue": round(total_revenue, 2),
+            "occupancy": round(total_nights / available_nights, 4) if available_nights else 0.0,
+            "adr": round(total_revenue / total_nights, 2) if total_nights else 0.0,
+            "revpar": round(total_revenue / available_nights, 2) if available_nights else 0.0,
+        },
+        "daily": [
+            {
+                "date": str(days[i]),
+                "occupied": int(occupied[i]),
+                "occupancy": round(float(occupancy[i]), 4),
+                "revenue": round(float(revenue[i]), 2),
+                "adr": round(float(adr[i]), 2),
+                "revpar": round(float(revpar[i]), 2),
+            } for i in range(n_days)
+        ],
+        "by_type": [
+            {
+                "type": str(types[t]),
+                "label": ROOM_TYPE_LABELS.get(str(types[t]), str(types[t])),
+                "rooms": int(rooms_by_type[t]),
+                "room_nights": int(type_nights[t]),
+                "revenue": round(float(type_revenue[t]), 2),
+                "occupancy": round(float(type_occupancy[t]), 4),
+                "adr": round(float(type_adr[t]), 2),
+                "revpar": round(float(type_revpar[t]), 2),
+            } for t in range(n_types)
+        ],
+    }
+
+
+def occupancy_report(db, hotel_id, start: datetime.date, end: datetime.date) -> dict:
+    arrays = load_report_arrays(db, hotel_id, start, end)
+    return compute_occupancy_report(*arrays, start, end)
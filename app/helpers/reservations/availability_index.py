@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+from app.models.reservations import Reservations
+from app.models.table_versions import TableVersion
+
+# status que ocupam quarto/hóspede no período
+ACTIVE_STATUSES = ("booked", "checked_in")
+
+# o índice é recarregado quando o contador de versões de "reservations" do hotel muda
+# (escritas de qualquer worker); o TTL (segundos) cobre escritas feitas fora do app
+INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "60"))
+
+
+class _IntervalList:
+    """Sorted list of (check_in, check_out, reservation_id) intervals."""
+
+    __slots__ = ("items", "max_span")
+
+    def __init__(self):
+        self.items = []
+        self.max_span = None
+
+    def add(self, check_in, check_out, reservation_id):
+        insort(self.items, (check_in, check_out, reservation_id))
+        span = check_out - check_in
+        if self.max_span is None or span > self.max_span:
+            self.max_span = span
+
+    def remove(self, check_in, check_out, reservation_id):
+        idx = bisect_left(self.items, (check_in, check_out, reservation_id))
+        if idx < len(self.items) and self.items[idx] == (check_in, check_out, reservation_id):
+            del self.items[idx]
+
+    def overlapping(self, check_in, check_out):
+        """Ids of the intervals that overlap [check_in, check_out)."""
+        # só os intervalos que começam antes do check_out pedido podem colidir;
+        # e, como nenhum dura mais que max_span, basta voltar até check_in - max_span
+        if not self.items:
+            return
+        idx = bisect_left(self.items, (check_out,))
+        lower = check_in - self.max_span
+        while idx > 0:
+            idx -= 1
+            start, end, reservation_id = self.items[idx]
+            if start < lower:
+                break
+            if end > check_in:
+                yield reservation_id
+
+    def overlaps(self, check_in, check_out):
+        return next(self.overlapping(check_in, check_out), None) is not None
+
+
+class HotelAvailabilityIndex:
+    """Active reservations of one hotel, indexed by check-in for the whole hotel and by guest.
+
+    Busy rooms and guests for a period come from one range lookup over the hotel's
+    intervals, without visiting every room or guest.
+    """
+
+    def __init__(self, hotel_id, version=0):
+        self.hotel_id = hotel_id
+        self.version = version
+        self.intervals = _IntervalList()
+        self.guests = {}
+        self.by_id = {}
+        self.loaded_at = time.monotonic()
+
+    def add(self, reservation_id, room_id, guest_id, check_in, check_out):
+        self.remove(reservation_id)
+        self.intervals.add(check_in, check_out, reservation_id)
+        self.guests.setdefault(guest_id, _IntervalList()).add(check_in, check_out, reservation_id)
+        self.by_id[reservation_id] = (room_id, guest_id, check_in, check_out)
+
+    def remove(self, reservation_id):
+        entry = self.by_id.pop(reservation_id, None)
+        if entry is None:
+            return
+        room_id, guest_id, check_in, check_out = entry
+        self.intervals.remove(check_in, check_out, reservation_id)
+        self.guests[guest_id].remove(check_in, check_out, reservation_id)
+
+    def busy_rooms(self, check_in, check_out):
+        return {self.by_id[rid][0] for rid in self.intervals.overlapping(check_in, check_out)}
+
+    def busy_guests(self, check_in, check_out):
+        return {self.by_id[rid][1] for rid in self.intervals.overlapping(check_in, check_out)}
+
+    def guest_has_conflict(self, guest_id, check_in, check_out):
+        intervals = self.guests.get(guest_id)
+        return bool(intervals and intervals.overlaps(check_in, check_out))
+
+    def is_expired(self):
+        return time.monotonic() - self.loaded_at > INDEX_TTL
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _reservations_version(db, hotel_id):
+    return db.query(TableVersion.version) \
+        .filter(TableVersion.table_name == "reservations") \
+        .filter(TableVersion.hotel_id == hotel_id) \
+        .scalar() or 0
+
+
+def _load_hotel(db, hotel_id, version):
+    index = HotelAvailabilityIndex(hotel_id, version)
+    rows = db.query(
+        Reservations.id,
+        Reservations.room_id,
+        Reservations.guest_id,
+        Reservations.check_in,
+        Reservations.check_out
+    ) \
+        .filter(Reservations.hotel_id == hotel_id) \
+        .filter(Reservations.status.in_(ACTIVE_STATUSES)) \
+        .all()
+    for reservation_id, room_id, guest_id, check_in, check_out in rows:
+        index.add(reservation_id, room_id, guest_id, check_in, check_out)
+    return index
+
+
+def get_hotel_index(db, hotel_id):
+    # versão lida antes das reservas: uma escrita no meio só causa um recarregamento a mais
+    version = _reservations_version(db, hotel_id)
+    with _lock:
+        index = _indexes.get(hotel_id)
+    if index is None or index.version != version or index.is_expired():
+        index = _load_hotel(db, hotel_id, version)
+        with _lock:
+            _indexes[hotel_id] = index
+    return index
+
+
+def busy_rooms(db, hotel_id, check_in, check_out):
+    index = get_hotel_index(db, hotel_id)
+    with _lock:
+        return index.busy_rooms(check_in, check_out)
+
+
+def busy_guests(db, hotel_id, check_in, check_out):
+    index = get_hotel_index(db, hotel_id)
+    with _lock:
+        return index.busy_guests(check_in, check_out)
+
+
+def guest_has_conflict(db, hotel_id, guest_id, check_in, check_out):
+    index = get_hotel_index(db, hotel_id)
+    with _lock:
+        return index.guest_has_conflict(guest_id, check_in, check_out)
+
+
+def sync_reservation(hotel_id, reservation):
+    # chamado pelos helpers após o commit: mantém o índice deste worker igual ao banco
+    # até a próxima consulta, que recarrega pela versão nova
+    entry = (
+        reservation.id,
+        reservation.room_id,
+        reservation.guest_id,
+        reservation.check_in,
+        reservation.check_out
+    )
+    active = reservation.status in ACTIVE_STATUSES
+    with _lock:
+        index = _indexes.get(hotel_id)
+        if index is None:
+            return
+        if active:
+            index.add(*entry)
+        else:
+            index.remove(entry[0])
+
+
+def invalidate_hotel(hotel_id=None):
+    # descarta o índice (de um hotel, ou de todos) para forçar o recarregamento
+    with _lock:
+        if hotel_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(hotel_id, None)
@@ -0,0 +1,128 @@
+import datetime
+from sqlalchemy import case, update
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms
+from app.helpers.reservations.availability_index import invalidate_hotel
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import broadcaster, reservation_event
+from app.utils.etag import bump_versions
+from app.helpers.reports.daily_occupancy import add_stay, apply_deltas, new_deltas
+
+MAX_BATCH_SIZE = 200
+
+
+def _update_all(db, ids, stmt) -> bool:
+    """Run a guarded UPDATE; True when it matched every one of `ids`."""
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount == len(ids)
+
+
+def batch_update_reservations(reservation_ids, hotel_id, db):
+    # mesma máquina de estados do fast_update_reservation, para várias reservas:
+    # uma leitura, um UPDATE por transição e um único commit
+    reservation_ids = list(dict.fromkeys(reservation_ids))[:MAX_BATCH_SIZE]
+    rows = db.query(
+        Reservations.id,
+        Reservations.status,
+        Reservations.guest_id,
+        Reservations.room_id,
+        Reservations.check_in,
+        Reservations.check_out,
+        Rooms.type.label("room_type"),
+        Rooms.price.label("room_price"),
+        Rooms.status.label("room_status")
+    ) \
+        .join(Rooms, Rooms.id == Reservations.room_id) \
+        .filter(Reservations.id.in_(reservation_ids)) \
+        .filter(Rooms.hotel_id == hotel_id) \
+        .with_for_update() \
+        .all()
+    # reservas e quartos ficam travados até o commit: um update avulso ou o scheduler
+    # não aplicam a mesma transição em paralelo
+    found = {row.id: row for row in rows}
+
+    to_checkin, to_checkout = [], []
+    rooms_in, rooms_out = set(), set()
+    results = {}
+
+    for reservation_id in reservation_ids:
+        row = found.get(reservation_id)
+        if not row:
+            results[reservation_id] = {"id": reservation_id, "status": None, "guest": None, "message": "Reserva não encontrada."}
+            continue
+        if row.status == 'booked' and row.room_status == 'available' and row.room_id not in rooms_in:
+            to_checkin.append(row.id)
+            rooms_in.add(row.room_id)
+            new_status = 'checked_in'
+        elif row.status == 'checked_in' and row.room_status == 'occupied' and row.room_id not in rooms_out:
+            to_checkout.append(row.id)
+            rooms_out.add(row.room_id)
+            new_status = 'checked_out'
+        else:
+            results[reservation_id] = {"id": row.id, "status": None, "guest": row.guest_id, "message": "Não foi possível modificar essa reserva."}
+            continue
+        results[reservation_id] = {"id": row.id, "status": new_status, "guest": row.guest_id, "message": f"Reserva {row.id} atualizada."}
+
+    now = datetime.datetime.now()
+    # move as diárias no rollup com os mesmos valores que os UPDATEs abaixo gravam
+    deltas = new_deltas()
+    events = []
+    for reservation_id in to_checkin + to_checkout:
+        row = found[reservation_id]
+        add_stay(deltas, hotel_id, row.room_type, row.room_price, row.status, row.check_in, row.check_out, sign=-1)
+        if row.status == 'booked':
+            check_out = now + datetime.timedelta(days=1) if row.check_out < now else row.check_out
+            add_stay(deltas, hotel_id, row.room_type, row.room_price, 'checked_in', now, check_out)
+            events.append(reservation_event(row.id, 'checked_in', row.room_id, 'occupied', now, check_out, row.guest_id))
+        else:
+            add_stay(deltas, hotel_id, row.room_type, row.room_price, 'checked_out', row.check_in, now)
+            events.append(reservation_event(row.id, 'checked_out', row.room_id, 'available', row.check_in, now, row.guest_id))
+
+    # cada UPDATE repete a condição da transição; se alguma linha não bater, nada é gravado
+    applied = True
+    if to_checkin:
+        applied &= _update_all(db, to_checkin, update(Reservations)
+            .where(Reservations.id.in_(to_checkin))
+            .where(Reservations.status == 'booked')
+            .values(
+                status='checked_in',
+                check_in=now,
+                check_out=case(
+                    (Reservations.check_out < now, now + datetime.timedelta(days=1)),
+                    else_=Reservations.check_out
+                )
+            ))
+        applied &= _update_all(db, rooms_in, update(Rooms)
+            .where(Rooms.id.in_(rooms_in))
+            .where(Rooms.status == 'available')
+            .values(status='occupied'))
+    if to_checkout:
+        applied &= _update_all(db, to_checkout, update(Reservations)
+            .where(Reservations.id.in_(to_checkout))
+            .where(Reservations.status == 'checked_in')
+            .values(status='checked_out', check_out=now))
+        applied &= _update_all(db, rooms_out, update(Rooms)
+            .where(Rooms.id.in_(rooms_out))
+            .where(Rooms.status == 'occupied')
+            .values(status='available'))
+
+    if not applied:
+        db.rollback()
+        for reservation_id in to_checkin + to_checkout:
+            row = found[reservation_id]
+            results[reservation_id] = {"id": row.id, "status": None, "guest": row.guest_id, "message": "A reserva foi modificada por outra operação. Tente novamente."}
+        return [results[reservation_id] for reservation_id in reservation_ids]
+
+    if to_checkin or to_checkout:
+        apply_deltas(db, deltas)
+        bump_versions(db, [("reservations", hotel_id), ("rooms", hotel_id)])
+        db.commit()
+        invalidate_hotel(hotel_id)
+        invalidate_kpis(hotel_id)
+        for event in events:
+            broadcaster.publish(hotel_id, event)
+    else:
+        # nada a gravar: solta os locks da leitura
+        db.rollback()
+
+    return [results[reservation_id] for reservation_id in reservation_ids]
@@ -1,9 +1,14 @@
 import datetime
 from app.utils.flash import add_flash_message
 from fastapi import HTTPException
+from app.helpers.reservations.availability_index import sync_reservation
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import publish_reservation
+from app.helpers.reports.daily_occupancy import record_stay_change, stay_snapshot
 
 def booked_to_checkin(request, check_in, reservation, db):
     if check_in and reservation.Reservations.status == 'booked' and reservation.Rooms.status == 'available':
+        before = stay_snapshot(reservation.Reservations)
         reservation.Reservations.status = 'checked_in'
         check_in_now = datetime.datetime.now()
         reservation.Reservations.check_in = check_in_now
@@ -11,9 +16,13 @@ def booked_to_checkin(request, check_in, reservation, db):
             reservation.Reservations.check_out = check_in_now + datetime.timedelta(days=1)
             add_flash_message(request, "Devido ao conflito de datas, a previsão do check-out foi alterada automaticamente.", "warning")
         reservation.Rooms.status = 'occupied'
+        record_stay_change(db, reservation.Rooms, before, reservation.Reservations)
         db.commit()
         db.refresh(reservation.Reservations)
         db.refresh(reservation.Rooms)
+        sync_reservation(reservation.Rooms.hotel_id, reservation.Reservations)
+        invalidate_kpis(reservation.Rooms.hotel_id)
+        publish_reservation(reservation.Rooms.hotel_id, reservation.Reservations, reservation.Rooms)
         add_flash_message(request, "Reserva atualizada com sucesso!", 'success')
     elif check_in and (reservation.Reservations.status != 'booked' or reservation.Rooms.status != 'available'):
         raise HTTPException(status_code=303, headers={"Location": f'/dashboard_reservations/manage/{reservation.Reservations.id}'})
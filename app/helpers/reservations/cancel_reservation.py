@@ -1,6 +1,10 @@
 import datetime
 from app.utils.flash import add_flash_message
 from fastapi import HTTPException
+from app.helpers.reservations.availability_index import sync_reservation
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import publish_reservation
+from app.helpers.reports.daily_occupancy import record_stay_change, stay_snapshot
 
 
 def cancel_reservation(request, cancel, reservation, db):
@@ -11,10 +15,15 @@ def cancel_reservation(request, cancel, reservation, db):
         add_flash_message(request, "A reserva já foi encerrada", 'warning')
         raise HTTPException(status_code=303, headers={"Location": f'/dashboard_reservations/manage/{reservation.Reservations.id}'})
     elif cancel and (reservation.Reservations.status == 'booked' or reservation.Reservations.status == 'checked_in'):
+        before = stay_snapshot(reservation.Reservations)
         reservation.Reservations.status = 'canceled'
         reservation.Reservations.check_out = datetime.datetime.now()
         reservation.Rooms.status = 'available'
+        record_stay_change(db, reservation.Rooms, before, reservation.Reservations)
         db.commit()
         db.refresh(reservation.Reservations)
         db.refresh(reservation.Rooms)
+        sync_reservation(reservation.Rooms.hotel_id, reservation.Reservations)
+        invalidate_kpis(reservation.Rooms.hotel_id)
+        publish_reservation(reservation.Rooms.hotel_id, reservation.Reservations, reservation.Rooms)
         add_flash_message(request, "A reserva foi cancelada com sucesso", 'success')
\ No newline at end of file
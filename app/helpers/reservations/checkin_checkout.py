@@ -1,15 +1,24 @@
 import datetime
 from app.utils.flash import add_flash_message
 from fastapi import HTTPException
+from app.helpers.reservations.availability_index import sync_reservation
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import publish_reservation
+from app.helpers.reports.daily_occupancy import record_stay_change, stay_snapshot
 
 def ckeckin_to_checkout(request, check_out, reservation, db):
     if check_out and reservation.Reservations.status == 'checked_in' and reservation.Rooms.status == 'occupied':
+        before = stay_snapshot(reservation.Reservations)
         reservation.Reservations.status = 'checked_out'
         reservation.Reservations.check_out = datetime.datetime.now()
         reservation.Rooms.status = 'available'
+        record_stay_change(db, reservation.Rooms, before, reservation.Reservations)
         db.commit()
         db.refresh(reservation.Reservations)
         db.refresh(reservation.Rooms)
+        sync_reservation(reservation.Rooms.hotel_id, reservation.Reservations)
+        invalidate_kpis(reservation.Rooms.hotel_id)
+        publish_reservation(reservation.Rooms.hotel_id, reservation.Reservations, reservation.Rooms)
         add_flash_message(request, "Reserva atualizada com sucesso!", 'success')
     elif check_out and (reservation.Reservations.status != 'checked_in' or reservation.Rooms.status != 'occupied'):
         raise HTTPException(status_code=303, headers={"Location": f'/dashboard_reservations/manage/{reservation.Reservations.id}'})
\ No newline at end of file
@@ -1,7 +1,21 @@
 import datetime
 from fastapi import HTTPException
+from sqlalchemy import or_
 from app.utils.flash import add_flash_message
 from app.models.reservations import Reservations
+from app.helpers.reservations.availability_index import ACTIVE_STATUSES, sync_reservation
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import publish_reservation
+from app.helpers.reports.daily_occupancy import record_stay_change
+
+def _has_overlap(db, room_id, guest_id, check_in, check_out):
+    # leitura com trava: no REPEATABLE READ a leitura simples usaria o snapshot de antes das travas
+    return db.query(Reservations.id) \
+        .filter(or_(Reservations.room_id == room_id, Reservations.guest_id == guest_id)) \
+        .filter(Reservations.status.in_(ACTIVE_STATUSES)) \
+        .filter(Reservations.check_in < check_out, Reservations.check_out > check_in) \
+        .with_for_update(read=True) \
+        .first() is not None
 
 def verify_and_create_reservation(request, check_in, check_out, room, guest, db):
     if check_out <= check_in:
@@ -12,7 +26,16 @@ def verify_and_create_reservation(request, check_in, check_out, room, guest, db)
         add_flash_message(request, "O horário de check-out não pode ser menor que o horário atual.", "danger")
         raise HTTPException(status_code=303, headers={"Location": "/dashboard_reservations/new"})
 
-    
+    # o índice de disponibilidade de cada worker pode estar atrasado: confere no banco com o
+    # quarto e o hóspede travados (sempre nessa ordem), para que duas criações simultâneas
+    # do mesmo quarto ou hóspede passem uma de cada vez por aqui
+    db.refresh(room, with_for_update=True)
+    db.refresh(guest, with_for_update=True)
+    if _has_overlap(db, room.id, guest.id, check_in, check_out):
+        db.rollback()
+        add_flash_message(request, "O quarto ou o hóspede já tem uma reserva nesse período.", "danger")
+        raise HTTPException(status_code=303, headers={"Location": "/dashboard_reservations/new"})
+
     if check_in > datetime.datetime.now():
         status= 'booked'
     elif check_in <= datetime.datetime.now():
@@ -25,10 +48,15 @@ def verify_and_create_reservation(request, check_in, check_out, room, guest, db)
     new_reservation = Reservations(
         guest_id=guest.id,
         room_id=room.id,
+        hotel_id=room.hotel_id,
         check_in=check_in,
         check_out=check_out,
         status=status
     )
 
     db.add(new_reservation)
-    db.commit()
\ No newline at end of file
+    record_stay_change(db, room, None, new_reservation)
+    db.commit()
+    sync_reservation(room.hotel_id, new_reservation)
+    invalidate_kpis(room.hotel_id)
+    publish_reservation(room.hotel_id, new_reservation, room)
\ No newline at end of file
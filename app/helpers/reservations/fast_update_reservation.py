@@ -1,6 +1,11 @@
 import datetime
+from app.helpers.reservations.availability_index import sync_reservation
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import publish_reservation
+from app.helpers.reports.daily_occupancy import record_stay_change, stay_snapshot
 
 def fast_update_reservation(reservation, room, db):
+    before = stay_snapshot(reservation)
     if reservation.status == 'booked' and room.status == 'available':
         reservation.status = 'checked_in'
         check_in_now = datetime.datetime.now()
@@ -17,6 +22,10 @@ def fast_update_reservation(reservation, room, db):
             "message": f"Não foi possível modificar essa reserva."
         }
     
+    record_stay_change(db, room, before, reservation)
     db.commit()
     db.refresh(reservation)
-    db.refresh(room)
\ No newline at end of file
+    db.refresh(room)
+    sync_reservation(room.hotel_id, reservation)
+    invalidate_kpis(room.hotel_id)
+    publish_reservation(room.hotel_id, reservation, room)
\ No newline at end of file
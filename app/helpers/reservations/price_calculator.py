@@ -1,12 +1,18 @@
 from math import ceil
 
+SECONDS_PER_DAY = 24 * 3600
+
+def stay_days(check_in, check_out):
+    # diárias cobradas: dias da estadia arredondados para cima
+    days = check_out - check_in
+    return ceil(days.total_seconds() / SECONDS_PER_DAY)
+
 def calc_price(reservation):
     if reservation.Reservations.status != 'canceled':
         if not reservation.Reservations.check_out or not reservation.Reservations.check_in:
             return 0
-        days = reservation.Reservations.check_out - reservation.Reservations.check_in
-        total_days = ceil(days.total_seconds() / (24 * 3600))
+        total_days = stay_days(reservation.Reservations.check_in, reservation.Reservations.check_out)
         price = reservation.Rooms.price * total_days
         return price
     else:
-        return 0
\ No newline at end of file
+        return 0
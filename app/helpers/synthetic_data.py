@@ -0,0 +1,310 @@
+"""Synthetic hotels, rooms, guests and reservations for load testing.
+
+Usage: python -m app.helpers.synthetic_data [--hotels 10] [--rooms 100] [--guests 5000]
+       [--reservations 50000] [--seed 1] [--workers 4] [--batch-size 5000]
+
+Counts of rooms, guests and reservations are per hotel. Each hotel is generated from its
+own random stream (seed, hotel index), so the output does not depend on --workers. The
+hotel rows are inserted first, in index order, so the hotel ids do not depend on it either.
+"""
+import argparse
+import datetime
+import heapq
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from validate_docbr import CPF, CNPJ
+
+from app.core.config import engine
+from app.core.security import hash_password
+from app.helpers.reports.daily_occupancy import rebuild_rollup
+from app.models.guest import Guest
+from app.models.hotel import Hotel
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms, ROOM_CAPACITIES
+from app.utils.brdocs import only_digits
+from app.utils.etag import bump_versions
+from app.utils.text_search import normalize_text
+
+SYNTHETIC_PASSWORD = "sintetico123"
+DEFAULT_BATCH_SIZE = 5000
+
+# distribuição dos tipos de quarto (códigos de dashboard_rooms.create_room)
+ROOM_TYPE_WEIGHTS = {"1": 10, "2": 4, "3": 14, "4": 30, "5": 4, "6": 10, "7": 5, "8": 15, "9": 8}
+# diárias por estadia e dias vagos entre estadias de um quarto
+STAY_NIGHTS = ((1, 22), (2, 24), (3, 18), (4, 11), (5, 8), (7, 9), (10, 5), (14, 3))
+GAP_DAYS = ((0, 38), (1, 24), (2, 14), (3, 9), (5, 8), (10, 5), (21, 2))
+# fração do histórico que já passou; o resto são reservas futuras
+PAST_FRACTION = 0.9
+CANCELED_PAST = 0.08
+CANCELED_FUTURE = 0.06
+MAINTENANCE_RATE = 0.03
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "Yuri",
+               "Beatriz", "Caio", "Fernanda", "Gustavo", "Helena", "Igor", "Júlia", "Lucas", "Mariana", "Pedro"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Araújo", "Barbosa", "Conceição", "Melo",
+              "Cardoso", "Rocha", "Dias", "Teixeira", "Moreira", "Nunes", "Mendes", "Freitas", "Vieira", "Castro"]
+CITIES = [("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Salvador", "BA"),
+          ("Curitiba", "PR"), ("Porto Alegre", "RS"), ("Recife", "PE"), ("Fortaleza", "CE"),
+          ("Florianópolis", "SC"), ("Gramado", "RS"), ("Natal", "RN"), ("Manaus", "AM")]
+HOTEL_PREFIXES = ["Hotel", "Pousada", "Grand Hotel", "Residence", "Hotel Plaza", "Inn"]
+
+# multiplicador coprimo com 10: embaralha os índices sem repetir documentos
+_SCRAMBLE = 387420489
+_cpf = CPF()
+_cnpj = CNPJ()
+
+
+def _check_digit(digits, weights) -> str:
+    remainder = sum(int(d) * w for d, w in zip(digits, weights)) % 11
+    return "0" if remainder < 2 else str(11 - remainder)
+
+
+def synthetic_cpf(index: int, seed: int):
+    """Formatted, valid CPF unique for each (index, seed); None for the few invalid bases."""
+    base = f"{(index * _SCRAMBLE + seed * 7919) % 10 ** 9:09d}"
+    first = _check_digit(base, range(10, 1, -1))
+    digits = base + first + _check_digit(base + first, range(11, 1, -1))
+    # o validate_docbr recusa também os documentos com todos os dígitos iguais
+    return _cpf.mask(digits) if _cpf.validate(digits) else None
+
+
+def synthetic_cnpj(index: int, seed: int) -> str:
+    base = f"{(index * _SCRAMBLE + seed * 7919) % 10 ** 8:08d}0001"
+    first = _check_digit(base, (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+    digits = base + first + _check_digit(base + first, (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+    if not _cnpj.validate(digits):
+        raise ValueError(f"CNPJ sintético inválido: {digits}")
+    return _cnpj.mask(digits)
+
+
+def _weighted(rng, table):
+    values, weights = zip(*table)
+    return rng.choices(values, weights)[0]
+
+
+def _hotel_row(rng, index: int, seed: int) -> dict:
+    city, state = rng.choice(CITIES)
+    return {
+        "name": f"{rng.choice(HOTEL_PREFIXES)} {rng.choice(LAST_NAMES)} {city}",
+        "login": f"sintetico{seed}_{index}",
+        "address": f"Rua {rng.choice(LAST_NAMES)}, {rng.randint(1, 2000)}",
+        "city": city,
+        "state": state,
+        "zip_code": f"{rng.randint(10000, 99999)}-{rng.randint(0, 999):03d}",
+        "phone_number": f"({rng.randint(11, 99)}) 3{rng.randint(0, 9999999):07d}",
+        "email": f"contato{index}@hotel{seed}.example.com",
+        "cnpj": synthetic_cnpj(index, seed),
+        "is_active": True,
+    }
+
+
+def hotel_row(index: int, seed: int) -> dict:
+    """The hotel row of generate_hotel, without generating the rest."""
+    return _hotel_row(random.Random(f"{seed}:{index}"), index, seed)
+
+
+def generate_hotel(index: int, seed: int, rooms: int, guests: int, reservations: int, now: datetime.datetime) -> dict:
+    """Rows of one hotel, deterministic for (index, seed).
+
+    Rooms are keyed by room_number and guests by position; reservations reference both
+    by those keys until the ids exist. Stays never overlap in a room nor for a guest.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    hotel = _hotel_row(rng, index, seed)
+
+    room_rows = []
+    for r in range(rooms):
+        room_type = _weighted(rng, ROOM_TYPE_WEIGHTS.items())
+        adults, children = ROOM_CAPACITIES.get(room_type) or [rng.randint(1, 4), rng.randint(0, 3)]
+        room_rows.append({
+            "room_number": f"{r // 20 + 1}{r % 20 + 1:02d}",
+            "type": room_type,
+            "capacity_adults": adults,
+            "capacity_children": children,
+            "capacity_total": adults + children,
+            "price": float(round(rng.uniform(90, 160) * (adults + 0.5 * children), -1)),
+            "status": "available",
+            "is_active": True,
+        })
+
+    guest_rows = []
+    for g in range(guests):
+        cpf = synthetic_cpf(index * guests + g, seed)
+        if cpf is None:
+            continue
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        guest_rows.append({
+            "name": f"{first} {rng.choice(LAST_NAMES)} {last}",
+            "cpf": cpf,
+            "email": f"{first.lower()}.{len(guest_rows)}@example.com" if rng.random() < 0.85 else None,
+            "phone_number": f"({rng.randint(11, 99)}) 9{rng.randint(0, 99999999):08d}" if rng.random() < 0.9 else None,
+            "is_deleted": rng.random() < 0.02,
+        })
+
+    # linha do tempo de cada quarto, terminando no futuro
+    per_room = max(1, reservations // max(len(room_rows), 1))
+    avg_cycle = sum(n * w for n, w in STAY_NIGHTS) / sum(w for _, w in STAY_NIGHTS) \
+        + sum(n * w for n, w in GAP_DAYS) / sum(w for _, w in GAP_DAYS)
+    start = (now - datetime.timedelta(days=int(per_room * avg_cycle * PAST_FRACTION))).replace(hour=0, minute=0, second=0, microsecond=0)
+    stays = []
+    for room in room_rows:
+        day = start + datetime.timedelta(days=rng.randint(0, 6))
+        for _ in range(per_room):
+            check_in = day.replace(hour=14)
+            check_out = (check_in + datetime.timedelta(days=_weighted(rng, STAY_NIGHTS))).replace(hour=12)
+            stays.append((check_in, check_out, room["room_number"]))
+            day = check_out.replace(hour=0) + datetime.timedelta(days=_weighted(rng, GAP_DAYS))
+
+    # hóspedes livres na data do check-in, para que ninguém tenha duas estadias ao mesmo tempo
+    stays.sort()
+    free = [g for g, row in enumerate(guest_rows) if not row["is_deleted"]]
+    busy = []
+    reservation_rows = []
+    occupied_rooms = set()
+    for check_in, check_out, room_number in stays:
+        while busy and busy[0][0] <= check_in:
+            free.append(heapq.heappop(busy)[1])
+        if not free:
+            continue
+        pick = rng.randrange(len(free))
+        free[pick], free[-1] = free[-1], free[pick]
+        guest = free.pop()
+        heapq.heappush(busy, (check_out, guest))
+
+        if check_out <= now:
+            status = "canceled" if rng.random() < CANCELED_PAST else "checked_out"
+        elif check_in <= now:
+            status = "checked_in"
+            occupied_rooms.add(room_number)
+        else:
+            status = "canceled" if rng.random() < CANCELED_FUTURE else "booked"
+        reservation_rows.append({
+            "guest": guest, "room_number": room_number,
+            "check_in": check_in, "check_out": check_out, "status": status,
+        })
+
+    for room in room_rows:
+        if room["room_number"] in occupied_rooms:
+            room["status"] = "occupied"
+        elif rng.random() < MAINTENANCE_RATE:
+            room["status"] = "maintenance"
+
+    return {"hotel": hotel, "rooms": room_rows, "guests": guest_rows, "reservations": reservation_rows}
+
+
+def _insert(conn, table, rows, batch_size):
+    # executemany: o mysqlclient junta cada lote num único INSERT ... VALUES (...), (...)
+    for i in range(0, len(rows), batch_size):
+        conn.execute(table.insert(), rows[i:i + batch_size])
+
+
+def insert_hotels(conn, indexes, seed: int, password_hash: str) -> list:
+    """Insert the hotel rows one by one in index order; returns their ids in the same order."""
+    return [
+        conn.execute(Hotel.__table__.insert().values(**hotel_row(index, seed), password=password_hash)).inserted_primary_key[0]
+        for index in indexes
+    ]
+
+
+def insert_hotel(conn, hotel_id: int, data: dict, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Insert the rooms, guests and reservations from generate_hotel under an existing hotel."""
+    _insert(conn, Rooms.__table__, [{**row, "hotel_id": hotel_id} for row in data["rooms"]], batch_size)
+    room_ids = dict(conn.execute(select(Rooms.room_number, Rooms.id).where(Rooms.hotel_id == hotel_id)).all())
+
+    # os eventos before_insert do ORM não rodam em inserts do Core: colunas de busca calculadas aqui
+    _insert(conn, Guest.__table__, [
+        {**row, "hotel_id": hotel_id, "name_search": normalize_text(row["name"]), "cpf_digits": only_digits(row["cpf"])}
+        for row in data["guests"]
+    ], batch_size)
+    guest_ids = dict(conn.execute(select(Guest.cpf_digits, Guest.id).where(Guest.hotel_id == hotel_id)).all())
+    guest_ids = [guest_ids[only_digits(row["cpf"])] for row in data["guests"]]
+
+    _insert(conn, Reservations.__table__, [
+        {
+            "guest_id": guest_ids[row["guest"]], "room_id": room_ids[row["room_number"]], "hotel_id": hotel_id,
+            "check_in": row["check_in"], "check_out": row["check_out"], "status": row["status"],
+        }
+        for row in data["reservations"]
+    ], batch_size)
+
+
+def _load_hotel(index: int, hotel_id: int, args, now: datetime.datetime) -> dict:
+    started = time.perf_counter()
+    data = generate_hotel(index, args.seed, args.rooms, args.guests, args.reservations, now)
+    with Session(engine) as db:
+        insert_hotel(db.connection(), hotel_id, data, args.batch_size)
+        if engine.dialect.name == "mysql":
+            # inserts do Core não passam pelo after_flush: invalida os ETags e refaz o rollup aqui
+            bump_versions(db, [(table, hotel_id) for table in ("hotels", "rooms", "guests", "reservations")])
+            db.commit()
+            rebuild_rollup(db, hotel_id)
+        else:
+            db.commit()
+    return {
+        "hotel_id": hotel_id,
+        "login": data["hotel"]["login"],
+        "rooms": len(data["rooms"]),
+        "guests": len(data["guests"]),
+        "reservations": len(data["reservations"]),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def _init_worker():
+    # processos criados por fork herdam as conexões do pai: descarta o pool sem fechá-las
+    engine.dispose(close=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.helpers.synthetic_data",
+        description="Gera hotéis, quartos, hóspedes e reservas sintéticos para testes de carga.",
+    )
+    parser.add_argument("--hotels", type=int, default=10)
+    parser.add_argument("--rooms", type=int, default=100, help="quartos por hotel")
+    parser.add_argument("--guests", type=int, default=5000, help="hóspedes por hotel")
+    parser.add_argument("--reservations", type=int, default=50000, help="reservas por hotel")
+    parser.add_argument("--seed", type=int, default=1, help="mesma semente, mesmos dados")
+    parser.add_argument("--first-index", type=int, default=0, help="índice do primeiro hotel (para acrescentar hotéis)")
+    parser.add_argument("--workers", type=int, default=4, help="processos em paralelo (um hotel por vez cada)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="linhas por INSERT")
+    args = parser.parse_args(argv)
+
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    indexes = range(args.first_index, args.first_index + args.hotels)
+
+    started = time.perf_counter()
+    # os hotéis entram antes e em série: o id de cada um vem da ordem dos índices, não dos workers
+    with Session(engine) as db:
+        hotel_ids = insert_hotels(db.connection(), indexes, args.seed, password_hash)
+        db.commit()
+
+    totals = {"rooms": 0, "guests": 0, "reservations": 0}
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(_load_hotel, index, hotel_id, args, now)
+            for index, hotel_id in zip(indexes, hotel_ids)
+        ]
+        for future in futures:
+            result = future.result()
+            for key in totals:
+                totals[key] += result[key]
+            print(f"hotel {result['hotel_id']} ({result['login']}): {result['rooms']} quartos, "
+                  f"{result['guests']} hóspedes, {result['reservations']} reservas em {result['seconds']}s")
+
+    print(f"{args.hotels} hotéis, {totals['rooms']} quartos, {totals['guests']} hóspedes e "
+          f"{totals['reservations']} reservas em {time.perf_counter() - started:.1f}s "
+          f"(senha dos hotéis: {SYNTHETIC_PASSWORD})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
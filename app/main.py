@@ -1,33 +1,67 @@
 import os
+import secrets
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from app.routers import dashboard, dashboard_rooms
 from app.utils.flash import add_flash_message, render
 from sqlalchemy.orm import Session
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.sessions import SessionMiddleware
 
-from app.core.config import SessionLocal
+from app.core.config import get_db
+from app.core.security import shutdown_hash_executor
+from app.utils.static_assets import FingerprintedStaticFiles, STATIC_DIRECTORIES
+from app.utils.templating import templates, warm_templates
+from app.services.cnpj_ws import cnpj_service
+from app.services.scheduler import reservation_scheduler
+from app.services.broadcast import broadcaster
+from app.services.sessions import ServerSessionMiddleware, session_store
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.metrics import METRICS_TOKEN, MetricsMiddleware, metrics_refresher, render_metrics
+from app.utils.session_guard import hotel_status_cache
+from app.helpers.reports.dashboard_kpis import kpi_cache
 from app.models.guest import Guest
-from app.routers import auth, guest, dashboard, dashboard_rooms, dashboard_guests, dashboard_reservations
+from app.routers import auth, guest, dashboard, dashboard_rooms, dashboard_guests, dashboard_reservations, dashboard_reports, dashboard_live
 
-app = FastAPI(title="Hotel Management API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_templates()
+    await metrics_refresher.start()
+    if session_store is not None:
+        await session_store.start()
+    await cnpj_service.start()
+    await broadcaster.start()
+    reservation_scheduler.start()
+    yield
+    await reservation_scheduler.stop()
+    await broadcaster.close()
+    await cnpj_service.close()
+    if session_store is not None:
+        await session_store.close()
+    shutdown_hash_executor()
+    await metrics_refresher.close()
 
-templates = Jinja2Templates(directory="app/templates")
-app.mount("/static", StaticFiles(directory="app/static/main"), name="static")
-app.mount("/dashboard", StaticFiles(directory="app/static/dashboard"), name="dashboard")
+app = FastAPI(title="Hotel Management API", lifespan=lifespan)
 
-#criptografia das sessões
-app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY", "your_secret_key"))
+# arquivos estáticos com hash no nome, cache imutável e variantes gzip/brotli
+app.mount("/static", FingerprintedStaticFiles(directory=STATIC_DIRECTORIES["static"], name="static"), name="static")
+app.mount("/dashboard", FingerprintedStaticFiles(directory=STATIC_DIRECTORIES["dashboard"], name="dashboard"), name="dashboard")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+#sessões: no servidor, com só o id no cookie (SESSION_BACKEND=cookie volta ao cookie assinado)
+if session_store is not None:
+    app.add_middleware(ServerSessionMiddleware, store=session_store)
+else:
+    app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY", "your_secret_key"))
+
+#perfil por amostragem: consultas SQL, tempo de banco e de templates no Server-Timing e no log
+app.add_middleware(ProfilingMiddleware)
+
+#métricas Prometheus por rota (mais externo: mede a requisição inteira)
+app.add_middleware(MetricsMiddleware)
+metrics_refresher.watch_cache("hotel_status", hotel_status_cache)
+metrics_refresher.watch_cache("cnpj_ws", cnpj_service.cache)
+metrics_refresher.watch_cache("dashboard_kpis", kpi_cache)
 
 #INCLUSAO DAS ROTAS DE API
 app.include_router(auth.api_router)
@@ -44,6 +78,8 @@ app.include_router(dashboard.router)
 app.include_router(dashboard_rooms.router)
 app.include_router(dashboard_guests.router)
 app.include_router(dashboard_reservations.router)
+app.include_router(dashboard_reports.router)
+app.include_router(dashboard_live.router)
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
 def home(request: Request, db: Session = Depends(get_db)):
@@ -52,6 +88,14 @@ def home(request: Request, db: Session = Depends(get_db)):
     return render(templates, request, "index.html", {"request": request, "guests": guests})
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        return Response(status_code=401)
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 REDIRECT_STATUSES = {301, 302, 303, 307, 308}
 
 # Handler para erros HTTP
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey
+from app.core.config import Base
+
+# op.create_table(
+#     'daily_occupancy',
+#     sa.Column('hotel_id', sa.Integer, sa.ForeignKey('hotels.id', ondelete="CASCADE"), primary_key=True),
+#     sa.Column('date', sa.Date, primary_key=True),
+#     sa.Column('room_type', sa.String(50), primary_key=True),
+#     sa.Column('occupied', sa.Integer, nullable=False, server_default='0'),
+#     sa.Column('booked', sa.Integer, nullable=False, server_default='0'),
+#     sa.Column('revenue', sa.Numeric(12, 2), nullable=False, server_default='0'),
+# )
+
+class DailyOccupancy(Base):
+    """Room-nights and revenue per hotel, day and room type, kept in sync by the reservation helpers."""
+    __tablename__ = "daily_occupancy"
+
+    hotel_id = Column(Integer, ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    room_type = Column(String(50), primary_key=True)
+    # diárias de hospedagens iniciadas (checked_in/checked_out) e de reservas futuras (booked)
+    occupied = Column(Integer, nullable=False, default=0, server_default='0')
+    booked = Column(Integer, nullable=False, default=0, server_default='0')
+    revenue = Column(Numeric(12, 2), nullable=False, default=0, server_default='0')
@@ -1,6 +1,8 @@
 from xmlrpc.client import DateTime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Boolean, Index, event
 from app.core.config import Base
+from app.utils.text_search import normalize_text
+from app.utils.brdocs import only_digits
 
 class Guest(Base):
     __tablename__ = "guests"
@@ -14,3 +16,20 @@ class Guest(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False)
+    # nome normalizado (sem acentos/pontuação) para o índice FULLTEXT da busca
+    name_search = Column(String(100), nullable=True)
+    # CPF só com dígitos, único por hotel, usado nas buscas e verificações
+    cpf_digits = Column(String(11), nullable=False)
+
+    __table_args__ = (
+        Index("ix_guests_hotel_id_is_deleted", "hotel_id", "is_deleted"),
+        Index("ix_guests_name_search", "name_search", mysql_prefix="FULLTEXT"),
+        Index("ux_guests_hotel_id_cpf_digits", "hotel_id", "cpf_digits", unique=True),
+    )
+
+
+@event.listens_for(Guest, "before_insert")
+@event.listens_for(Guest, "before_update")
+def _sync_search_columns(mapper, connection, target):
+    target.name_search = normalize_text(target.name)
+    target.cpf_digits = only_digits(target.cpf)
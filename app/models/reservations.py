@@ -1,6 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, ForeignKey, SmallInteger, Computed, Index
 from app.core.config import Base
 
+# ordem de exibição das reservas (reservadas, hospedadas, encerradas, canceladas)
+STATUS_RANK_SQL = (
+    "CASE status WHEN 'booked' THEN 1 WHEN 'checked_in' THEN 2 "
+    "WHEN 'checked_out' THEN 3 WHEN 'canceled' THEN 4 ELSE 5 END"
+)
+
 # op.create_table(
 #     'reservations',
 #     sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
@@ -19,8 +25,18 @@ class Reservations(Base):
     id = Column(Integer, primary_key=True, index=True)
     guest_id = Column(Integer, ForeignKey("guests.id", ondelete="CASCADE"), nullable=False)
     room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    # hotel do quarto, copiado para a lista de reservas usar um índice que começa pelo hotel
+    hotel_id = Column(Integer, ForeignKey("hotels.id", ondelete="CASCADE"), nullable=False)
     check_in = Column(DateTime, nullable=False)
     check_out = Column(DateTime, nullable=False)
     status = Column(String(50), nullable=False, default='booked')
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    # coluna gerada (virtual) com a posição do status, indexada junto do check-in
+    status_rank = Column(SmallInteger, Computed(STATUS_RANK_SQL, persisted=False))
+
+    __table_args__ = (
+        Index("ix_reservations_hotel_id_status_rank_check_in_id", "hotel_id", "status_rank", "check_in", "id"),
+        Index("ix_reservations_room_id_status_check_in", "room_id", "status", "check_in", "check_out"),
+        Index("ix_reservations_guest_id_status_check_in", "guest_id", "status", "check_in", "check_out"),
+    )
@@ -1,6 +1,18 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, ForeignKey, Float, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, ForeignKey, Float, Enum, Text, Index
 from app.core.config import Base
 
+# capacidade (adultos, crianças) de cada tipo de quarto; o tipo "9" (personalizado) vem do formulário
+ROOM_CAPACITIES = {
+    "1": [1, 0],
+    "2": [1, 1],
+    "3": [2, 0],
+    "4": [2, 0],
+    "5": [1, 2],
+    "6": [2, 1],
+    "7": [3, 0],
+    "8": [2, 1],
+}
+
 # op.create_table(
 #     'rooms',
 #     sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
@@ -32,4 +44,9 @@ class Rooms(Base):
     comments = Column(Text, nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_rooms_hotel_id_room_number", "hotel_id", "room_number"),
+        Index("ix_rooms_hotel_id_status", "hotel_id", "status"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, BigInteger
+from app.core.config import Base
+
+# op.create_table(
+#     'table_versions',
+#     sa.Column('table_name', sa.String(50), primary_key=True),
+#     sa.Column('hotel_id', sa.Integer, primary_key=True, autoincrement=False),
+#     sa.Column('version', sa.BigInteger, nullable=False, server_default='0'),
+# )
+
+class TableVersion(Base):
+    """Change counter per table and hotel, bumped in the transaction of every write (ETags)."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(50), primary_key=True)
+    # sem FK: o contador precisa sobreviver à exclusão do hotel
+    hotel_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0, server_default='0')
@@ -1,35 +1,34 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from app.utils.templating import templates
 from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
 
-from app.core.config import SessionLocal
+from app.core.config import get_db
 from app.models.hotel import Hotel
 from app.schemas.hotel import HotelCreate, HotelOut, RegisterHotelStep1In, RegisterHotelStep1Out
-from app.core.security import generate_csrf_token, validate_csrf_token, hash_password, verify_password, create_access_token, decode_access_token
+from app.core.security import generate_csrf_token, validate_csrf_token, hash_password_async, verify_and_update_password_async, create_access_token, decode_access_token
 from app.utils.brdocs import is_valid_cnpj, format_cnpj, only_digits
 from app.utils.flash import add_flash_message, render
+from app.utils.etag import table_etag, is_not_modified, not_modified_response, set_etag
 from app.services.cnpj_ws import fetch_cnpj_situacao, CNPJWsError
+from app.services.sessions import rotate_session
 
 router = APIRouter(prefix="/auth", tags=["hotels"])
 api_router = APIRouter(prefix="/api", tags=["api_hotels"])
-templates = Jinja2Templates(directory="app/templates")
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @api_router.get("/get_hotels", response_model=List[HotelOut])
 def get_hotels(
+    request: Request,
+    response: Response,
     cnpj: Optional[str] = Query(None, description="Filtrar pelo CNPJ do hotel"),
     name: Optional[str] = Query(None, description="Filtrar pelo nome do hotel"),
     db: Session = Depends(get_db)
 ):
+    etag = table_etag(db, "hotels", request)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     query = db.query(Hotel)
 
     if cnpj:
@@ -41,7 +40,8 @@ def get_hotels(
 
     if not hotels:
         raise HTTPException(status_code=404, detail="Nenhum hotel encontrado")
-    
+
+    set_etag(response, etag)
     return hotels
 
 @router.get("", response_class=HTMLResponse, include_in_schema=False)
@@ -150,7 +150,7 @@ async def register_hotel(
         add_flash_message(request, "CNPJ com situação irregular", "danger")
         return RedirectResponse(url='/auth', status_code=303)
 
-    hashed_password = bcrypt.hash(password)
+    hashed_password = await hash_password_async(password)
 
     new_hotel = Hotel(
         name=name,
@@ -191,14 +191,22 @@ async def login(
         add_flash_message(request, "Token de segurança inválido, tente novamente", "warning")
         return RedirectResponse(url="/auth", status_code=303)
     
-    if not verify_password(password, hotel.password):
+    password_ok, new_hash = await verify_and_update_password_async(password, hotel.password)
+    if not password_ok:
         add_flash_message(request, "Senha incorreta.", "warning")
         return RedirectResponse(url="/auth", status_code=303)
+
+    # atualiza o hash quando o custo do bcrypt mudou
+    if new_hash:
+        hotel.password = new_hash
+        db.commit()
     
     if not hotel.is_active:
         add_flash_message(request, "O hotel está desativado no sistema", "warning")
         return RedirectResponse(url="/auth", status_code=303)
     
+    # id novo a cada login: um id plantado antes do login não vira sessão autenticada
+    rotate_session(request)
     request.session['hotel_id'] = hotel.id
     request.session['hotel_name'] = hotel.name
 
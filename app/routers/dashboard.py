@@ -1,15 +1,23 @@
-from app.core.config import SessionLocal
+import datetime
+from app.core.config import get_db, pool_stats
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from app.utils.templating import templates
 from sqlalchemy.orm import Session
 from passlib.hash import bcrypt
 
 from app.utils.flash import render
-from app.utils.session_guard import require_session
+from app.utils.session_guard import require_session, hotel_status_cache
+from app.services.cnpj_ws import cnpj_service
+from app.services.scheduler import reservation_scheduler
+from app.services.broadcast import broadcaster
+from app.services.sessions import session_store
+from app.utils.profiling import profiling_stats
 from app.schemas.rooms import RoomOut, RoomCreate, RoomsBase
 from app.models.rooms import Rooms
+from app.helpers.reports.daily_occupancy import rollup_summary
+from app.helpers.reports.dashboard_kpis import get_dashboard_kpis, kpi_cache
 
 router = APIRouter(
     prefix="/dashboard",
@@ -18,20 +26,51 @@ router = APIRouter(
 )
 
 api_router = APIRouter(prefix="/api", tags=["api_dashboard"])
-templates = Jinja2Templates(directory="app/templates")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@api_router.get("/pool_stats")
+def get_pool_stats():
+    return pool_stats()
+
+@api_router.get("/scheduler_stats")
+def get_scheduler_stats():
+    return reservation_scheduler.stats()
+
+@api_router.get("/broadcast_stats")
+def get_broadcast_stats():
+    return broadcaster.stats()
+
+@api_router.get("/profiling_stats")
+def get_profiling_stats():
+    return profiling_stats.stats()
+
+@api_router.get("/cache_stats")
+def get_cache_stats():
+    return {
+        "hotel_status": hotel_status_cache.stats(),
+        "cnpj_ws": cnpj_service.cache.stats(),
+        "dashboard_kpis": kpi_cache.stats(),
+        "sessions": session_store.stats() if session_store is not None else None,
+    }
+
+# em /api: os caminhos /dashboard/* são servidos pelo mount dos arquivos estáticos
+@api_router.get("/dashboard_kpis", dependencies=[Depends(require_session)])
+def dashboard_kpis(request: Request, db: Session = Depends(get_db)):
+    return get_dashboard_kpis(db, request.session.get("hotel_id"))
 
 @router.get("", response_class=HTMLResponse, include_in_schema=False)
-def dashboard(request: Request):
+def dashboard(request: Request, db: Session = Depends(get_db)):
+    hotel_id = request.session.get("hotel_id")
+    today = datetime.date.today()
+    period = datetime.timedelta(days=30)
     return render(
         templates,
         request,
-        "dashboard/index.html"
+        "dashboard/index.html",
+        {
+            "request": request,
+            "kpis": get_dashboard_kpis(db, hotel_id),
+            "past": rollup_summary(db, hotel_id, today - period, today),
+            "upcoming": rollup_summary(db, hotel_id, today, today + period),
+        }
     )
 
@@ -1,11 +1,11 @@
 import datetime
 from decimal import Decimal
-from app.core.config import SessionLocal
+from app.core.config import get_db
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import cast, DateTime, outerjoin
+from app.utils.templating import templates
+from sqlalchemy import cast, DateTime, outerjoin, and_, func
 from sqlalchemy.orm import Session, aliased
 from passlib.hash import bcrypt
 
@@ -13,9 +13,13 @@ from app.core.security import generate_csrf_token, validate_csrf_token
 from app.models.rooms import Rooms
 from app.utils.flash import add_flash_message, render
 from app.utils.session_guard import require_session
+from app.utils.pagination import paginate, DEFAULT_PAGE_SIZE
+from app.utils.etag import table_etag, is_not_modified, not_modified_response, set_etag
 from app.schemas.guest import GuestOut, GuestCreate, GuestBase
 from app.models.guest import Guest
 from app.models.reservations import Reservations
+from app.utils.brdocs import only_digits
+from app.helpers.guest_search import guest_name_filter, search_guests, MAX_SEARCH_RESULTS
 
 router = APIRouter(
     prefix="/dashboard_guests",
@@ -24,36 +28,38 @@ router = APIRouter(
 )
 
 api_router = APIRouter(prefix="/api", tags=["api_guests"])
-templates = Jinja2Templates(directory="app/templates")
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @api_router.get("/get_guests", response_model=List[GuestOut])
 def get_guests(
+    request: Request,
+    response: Response,
     guest_cpf: Optional[str] = Query(None, description="Filtrar pelo CPF do hóspede"),
     guest_name: Optional[str] = Query(None, description="Filtrar pelo nome do hóspede"),
     hotel_id: Optional[str] = Query(None, description="Filtrar pelo ID do hotel"),
+    limit: Optional[int] = Query(MAX_SEARCH_RESULTS, ge=1, description="Máximo de resultados da busca por nome"),
     db: Session = Depends(get_db)
 ):
+    etag = table_etag(db, "guests", request, hotel_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     query = db.query(Guest)
 
     if hotel_id:
         query = query.filter(Guest.hotel_id == hotel_id)
     if guest_cpf:
-        query = query.filter(Guest.cpf == guest_cpf)
-    if guest_name:
-        query = query.filter(Guest.name.ilike(f"%{guest_name}%"))
+        query = query.filter(Guest.cpf_digits == only_digits(guest_cpf))
 
-    guests = query.all()
+    # busca por nome: ranqueada pelo índice FULLTEXT e limitada
+    if guest_name:
+        guests = search_guests(query, guest_name, limit)
+    else:
+        guests = query.all()
 
     if not guests:
         raise HTTPException(status_code=404, detail="Nenhum hóspede encontrado")
 
+    set_etag(response, etag)
     return guests
 
 
@@ -62,43 +68,64 @@ def guests(
     request: Request,
     db: Session = Depends(get_db),
     name: Optional[str] = Query("", description="Nome do hóspede"),
-    cpf: Optional[str] = Query("", description="CPF do hóspede")
+    cpf: Optional[str] = Query("", description="CPF do hóspede"),
+    cursor: Optional[str] = Query(None, description="Cursor da página"),
+    limit: Optional[int] = Query(DEFAULT_PAGE_SIZE, ge=1, description="Hóspedes por página")
     ):
     hotel_id = request.session.get("hotel_id")
-    subquery = db.query(
+
+    # próxima estadia ativa de cada hóspede do hotel: numera as reservas ativas por
+    # hóspede e o join pega só a primeira, garantindo uma linha por hóspede
+    next_stay = db.query(
         Reservations.guest_id,
         Reservations.check_in.label('reservation_check_in'),
         Reservations.status.label('reservation_status'),
-        Reservations.id.label('reservation_id')
-    ).filter(
-        Reservations.status.in_(['booked', 'checked_in']),
-        Reservations.guest_id == Guest.id
-    ).order_by(Reservations.check_in)
-    subquery = subquery.subquery()
+        Reservations.id.label('reservation_id'),
+        func.row_number().over(
+            partition_by=Reservations.guest_id,
+            order_by=(Reservations.check_in, Reservations.id)
+        ).label('stay_order')
+    ) \
+        .join(Guest, Guest.id == Reservations.guest_id) \
+        .filter(
+            Guest.hotel_id == hotel_id,
+            Reservations.status.in_(['booked', 'checked_in'])
+        ) \
+        .subquery()
 
     query = db.query(
         Guest,
-        subquery.c.reservation_check_in,
-        subquery.c.reservation_status,
-        subquery.c.reservation_id
+        next_stay.c.reservation_check_in,
+        next_stay.c.reservation_status,
+        next_stay.c.reservation_id
     ) \
-        .outerjoin(subquery, Guest.id == subquery.c.guest_id) \
+        .outerjoin(next_stay, and_(Guest.id == next_stay.c.guest_id, next_stay.c.stay_order == 1)) \
         .filter(Guest.hotel_id == hotel_id, Guest.is_deleted == False)
 
+    # CPF sem nenhum dígito viraria LIKE '%' e listaria todos: é ignorado
+    cpf = only_digits(cpf)
     if name:
-        query = query.filter(Guest.name.ilike(f"%{name}%"))
-        add_flash_message(request, f"Filtro aplicado", "success")
+        query = query.filter(guest_name_filter(name))
     if cpf:
-        query = query.filter(Guest.cpf.like(f"%{cpf}%"))
+        query = query.filter(Guest.cpf_digits.like(f"{cpf}%"))
+    if (name or cpf) and not cursor:
         add_flash_message(request, f"Filtro aplicado", "success")
 
+    try:
+        guests, next_cursor = paginate(query, [Guest.id], lambda row: [row.Guest.id], cursor, limit)
+    except ValueError:
+        add_flash_message(request, "Página inválida, exibindo o início da lista.", "warning")
+        return RedirectResponse(url=str(request.url.remove_query_params("cursor")), status_code=303)
+
     return render(
         templates,
         request,
         "dashboard/guests/guests.html",
         {
             "request": request,
-            "guests": query.all(),
+            "guests": guests,
+            "next_page_url": str(request.url.include_query_params(cursor=next_cursor)) if next_cursor else None,
+            "first_page_url": str(request.url.remove_query_params("cursor")) if cursor else None,
             "has_filter": True if (name or cpf) else False,
             "now": datetime.datetime.now()
         }
@@ -133,11 +160,12 @@ def create_guest(
 
     hotel_id = request.session.get("hotel_id")
 
-    if db.query(Guest).filter(Guest.cpf == cpf).filter(Guest.hotel_id == hotel_id, Guest.is_deleted == False).first():
+    # uma única busca pelo índice (hotel_id, cpf_digits) cobre duplicado e hóspede apagado
+    guest = db.query(Guest).filter(Guest.hotel_id == hotel_id, Guest.cpf_digits == only_digits(cpf)).first()
+    if guest and not guest.is_deleted:
         add_flash_message(request, "CPF já cadastrado no seu hotel", "danger")
         return RedirectResponse(url="/dashboard_guests/new", status_code=status.HTTP_303_SEE_OTHER)
-    elif db.query(Guest).filter(Guest.cpf == cpf).filter(Guest.hotel_id == hotel_id, Guest.is_deleted == True).first():
-        guest = db.query(Guest).filter(Guest.cpf == cpf).filter(Guest.hotel_id == hotel_id, Guest.is_deleted == True).first()
+    elif guest:
         guest.name = name
         guest.email = email if email else None
         guest.phone_number = phone_number if phone_number else None
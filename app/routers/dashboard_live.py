@@ -0,0 +1,75 @@
+import asyncio
+import json
+import os
+from contextlib import suppress
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app.core.config import SessionLocal
+from app.services.broadcast import broadcaster
+from app.utils.session_guard import is_hotel_active
+
+router = APIRouter(
+    prefix="/dashboard_live",
+    tags=["live"],
+)
+
+# intervalo do keep-alive do SSE (proxies costumam fechar conexões ociosas)
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))
+
+def _live_hotel_id(session):
+    # sessão curta: a conexão ao vivo não deve segurar uma conexão do pool
+    hotel_id = session.get("hotel_id")
+    if not hotel_id:
+        return None
+    db = SessionLocal()
+    try:
+        return hotel_id if is_hotel_active(hotel_id, db) else None
+    finally:
+        db.close()
+
+@router.get("/events", include_in_schema=False)
+async def live_events(request: Request):
+    hotel_id = await asyncio.to_thread(_live_hotel_id, request.session)
+    if not hotel_id:
+        raise HTTPException(status_code=401, detail="Sessão expirada")
+
+    async def stream():
+        async with broadcaster.subscribe(hotel_id) as queue:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def live_ws(websocket: WebSocket):
+    hotel_id = await asyncio.to_thread(_live_hotel_id, websocket.session)
+    if not hotel_id:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    async with broadcaster.subscribe(hotel_id) as queue:
+        async def forward():
+            while True:
+                await websocket.send_json(await queue.get())
+
+        sender = asyncio.create_task(forward())
+        try:
+            # o cliente não envia nada; só aguarda o fechamento
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await sender
@@ -0,0 +1,67 @@
+import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+from app.utils.templating import templates
+from sqlalchemy.orm import Session
+
+from app.core.config import get_db
+from app.utils.flash import add_flash_message, render
+from app.utils.session_guard import require_session
+from app.helpers.reports.occupancy_report import occupancy_report, MAX_REPORT_DAYS
+
+router = APIRouter(
+    prefix="/dashboard_reports",
+    tags=["reports"],
+    dependencies=[Depends(require_session)]
+)
+
+
+def _report_period(start, end):
+    # padrão: mês corrente
+    today = datetime.date.today()
+    start = start or today.replace(day=1)
+    end = end or (start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    if end <= start:
+        raise ValueError("A data final deve ser posterior à data inicial.")
+    if (end - start).days > MAX_REPORT_DAYS:
+        raise ValueError(f"O período máximo do relatório é de {MAX_REPORT_DAYS} dias.")
+    return start, end
+
+@router.get("/data", include_in_schema=False)
+def report_data(
+    request: Request,
+    start: Optional[datetime.date] = Query(None, description="Início do período"),
+    end: Optional[datetime.date] = Query(None, description="Fim do período (exclusivo)"),
+    db: Session = Depends(get_db)
+):
+    hotel_id = request.session.get("hotel_id")
+    try:
+        start, end = _report_period(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return occupancy_report(db, hotel_id, start, end)
+
+@router.get("", response_class=HTMLResponse, include_in_schema=False)
+def reports(
+    request: Request,
+    start: Optional[datetime.date] = Query(None, description="Início do período"),
+    end: Optional[datetime.date] = Query(None, description="Fim do período (exclusivo)"),
+    db: Session = Depends(get_db)
+):
+    hotel_id = request.session.get("hotel_id")
+    try:
+        start, end = _report_period(start, end)
+    except ValueError as e:
+        add_flash_message(request, str(e), "warning")
+        return RedirectResponse(url="/dashboard_reports", status_code=303)
+
+    return render(
+        templates,
+        request,
+        "dashboard/reports/reports.html",
+        {
+            "request": request,
+            "report": occupancy_report(db, hotel_id, start, end),
+        }
+    )
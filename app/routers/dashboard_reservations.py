@@ -1,11 +1,11 @@
 from decimal import Decimal
 import sys
 import datetime
-from app.core.config import SessionLocal
+from app.core.config import get_db
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, status
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from app.utils.templating import templates
 from sqlalchemy import case, or_
 from sqlalchemy.orm import Session
 from passlib.hash import bcrypt
@@ -15,17 +15,22 @@ from app.core.security import generate_csrf_token, validate_csrf_token
 from app.models.rooms import Rooms
 from app.utils.flash import add_flash_message, render
 from app.utils.session_guard import require_session
-from app.schemas.reservations import ReservationBase, ReservationCreate, ReservationOut
+from app.utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.etag import table_etag, is_not_modified, not_modified_response, set_etag
+from app.schemas.reservations import ReservationBase, ReservationCreate, ReservationOut, ReservationBatchUpdate
 from app.models.reservations import Reservations
 from app.models.guest import Guest
 from app.helpers.verify_guest import verify_guest_by_id, verify_guest_by_cpf
 from app.helpers.verify_room import verify_room
+from app.helpers.guest_search import guest_name_filter
 from app.helpers.reservations.booked_checkin import booked_to_checkin
 from app.helpers.reservations.checkin_checkout import ckeckin_to_checkout
 from app.helpers.reservations.cancel_reservation import cancel_reservation
 from app.helpers.reservations.price_calculator import calc_price
 from app.helpers.reservations.fast_update_reservation import fast_update_reservation
+from app.helpers.reservations.batch_update_reservations import batch_update_reservations
 from app.helpers.reservations.create_reservation import verify_and_create_reservation
+from app.helpers.reservations.availability_index import busy_rooms, busy_guests, guest_has_conflict
 
 router = APIRouter(
     prefix="/dashboard_reservations",
@@ -34,23 +39,23 @@ router = APIRouter(
 )
 
 api_router = APIRouter(prefix="/api", tags=["api_reservations"])
-templates = Jinja2Templates(directory="app/templates")
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @api_router.get("/get_reservations", response_model=List[ReservationOut])
 def get_reservations(
+    request: Request,
+    response: Response,
     guest_id: Optional[int] = Query(None, description="Filtrar pelo ID do hóspede"),
     room_id: Optional[int] = Query(None, description="Filtrar pelo ID do quarto"),
     check_in: Optional[str] = Query(None, description="Filtrar pela data de check-in"),
     check_out: Optional[str] = Query(None, description="Filtrar pela data de check-out"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (header X-Next-Cursor)"),
+    limit: Optional[int] = Query(DEFAULT_PAGE_SIZE, ge=1, description=f"Itens por página (máximo {MAX_PAGE_SIZE})"),
     db: Session = Depends(get_db)
 ):
+    etag = table_etag(db, "reservations", request)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     query = db.query(Reservations)
 
     if guest_id:
@@ -62,37 +67,61 @@ def get_reservations(
     if check_out:
         query = query.filter(Reservations.check_out == check_out)
 
-    reservations = query.all()
+    try:
+        reservations, next_cursor = paginate(query, [Reservations.id], lambda r: [r.id], cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not reservations:
         raise HTTPException(status_code=404, detail="Nenhuma reserva encontrada")
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    set_etag(response, etag)
+
     return reservations
 
-@router.get("", response_class=HTMLResponse, include_in_schema=False)
-def reservations(
-    request: Request,
-    db: Session = Depends(get_db),
+def _reservation_filters(
     search: Optional[str] = Query("", description="Reserva ou Hóspede"),
     room: Optional[str] = Query(None, description="ID do quarto"),
     status: Optional[str] = Query("", description="Situação da reserva"),
     interval_in: Optional[str] = Query("", description="Intervalo do check-in"),
     check_in: Optional[str] = Query(None, description="Data do check-in"),
     interval_out: Optional[str] = Query("", description="Intervalo do check-out"),
-    check_out: Optional[str] = Query(None, description="Data do check-out")
-):
-    hotel_id = request.session.get("hotel_id")
-    
+    check_out: Optional[str] = Query(None, description="Data do check-out"),
+    cursor: Optional[str] = Query(None, description="Cursor da página"),
+    limit: Optional[int] = Query(DEFAULT_PAGE_SIZE, ge=1, description="Reservas por página")
+) -> dict:
+    return {
+        "search": search, "room": room, "status": status,
+        "interval_in": interval_in, "check_in": check_in,
+        "interval_out": interval_out, "check_out": check_out,
+        "cursor": cursor, "limit": limit,
+    }
+
+
+def _reservations_table(db: Session, hotel_id, filters: dict, page_url):
+    """Context of the reservations table and the messages for the user.
+
+    Returns (context, notices, invalid_cursor); notices are (category, message) pairs.
+    `page_url` is the URL of the full page, used by the pagination links.
+    """
+    search, room, status = filters["search"], filters["room"], filters["status"]
+    interval_in, check_in = filters["interval_in"], filters["check_in"]
+    interval_out, check_out = filters["interval_out"], filters["check_out"]
+    cursor = filters["cursor"]
+    notices = []
+
     query = db.query(Reservations, Rooms.room_number, Guest.name, Guest.id) \
         .join(Rooms, Rooms.id == Reservations.room_id) \
         .join(Guest, Guest.id == Reservations.guest_id) \
-        .filter(Rooms.hotel_id == hotel_id) \
+        .filter(Reservations.hotel_id == hotel_id) \
         
     if search:
         query = query.filter(
             or_(
                 Reservations.id == search,
-                Guest.name.ilike(f"%{search}%")
+                guest_name_filter(search)
             )
         )
     if room:
@@ -107,7 +136,7 @@ def reservations(
             elif interval_in == 'after':
                 query = query.filter(Reservations.check_in > check_in_dt)
         except ValueError as e:
-            add_flash_message(request, f"Erro: {e}", "danger")
+            notices.append(("danger", f"Erro: {e}"))
     if interval_out and check_out:
         try:
             check_out_dt = datetime.datetime.strptime(check_out, "%Y-%m-%dT%H:%M")
@@ -116,35 +145,76 @@ def reservations(
             elif interval_out == 'after':
                 query = query.filter(Reservations.check_out > check_out_dt)
         except ValueError as e:
-            add_flash_message(request, f"Erro: {e}", "danger")
+            notices.append(("danger", f"Erro: {e}"))
             
-    reservations = query.order_by(
-        case(
-            (Reservations.status == "booked", 1),
-            (Reservations.status == "checked_in", 2),
-            (Reservations.status == "checked_out", 3),
-            (Reservations.status == "canceled", 4),
-        ),
-        Reservations.check_in
-    ).all()
-    
-    if search or room or status or (interval_in and check_in) or (interval_out and check_out):
+    # paginação por cursor na ordem (status, check-in, id), servida pelo índice (hotel_id, status_rank, check_in, id)
+    order = [Reservations.status_rank, Reservations.check_in, Reservations.id]
+    sort_key = lambda row: [row.Reservations.status_rank, row.Reservations.check_in, row.Reservations.id]
+    invalid_cursor = False
+    try:
+        reservations, next_cursor = paginate(query, order, sort_key, cursor, filters["limit"])
+    except ValueError:
+        invalid_cursor = True
+        notices.append(("warning", "Página inválida, exibindo o início da lista."))
+        cursor = None
+        page_url = page_url.remove_query_params("cursor")
+        reservations, next_cursor = paginate(query, order, sort_key, None, filters["limit"])
+
+    has_filter = bool(search or room or status or (interval_in and check_in) or (interval_out and check_out))
+    if not cursor and has_filter and not invalid_cursor:
         if len(reservations) == 0:
-            add_flash_message(request, 'Nenhuma reserva encontrada com os filtros aplicados.', "warning")
-            return RedirectResponse(url='/dashboard_reservations', status_code=303)
-        elif len(reservations and (room or status or (interval_in and check_in) or (interval_out and check_out))) > 0:
-            add_flash_message(request, "Filtro aplicado", "success")
+            notices.append(("warning", "Nenhuma reserva encontrada com os filtros aplicados."))
+        elif room or status or (interval_in and check_in) or (interval_out and check_out):
+            notices.append(("success", "Filtro aplicado"))
+
+    context = {
+        "reservations": reservations,
+        "hotel_id": hotel_id,
+        "next_page_url": str(page_url.include_query_params(cursor=next_cursor)) if next_cursor else None,
+        "first_page_url": str(page_url.remove_query_params("cursor")) if cursor else None,
+        "has_filter": has_filter
+    }
+    return context, notices, invalid_cursor
+
+
+@router.get("", response_class=HTMLResponse, include_in_schema=False)
+def reservations(
+    request: Request,
+    db: Session = Depends(get_db),
+    filters: dict = Depends(_reservation_filters)
+):
+    hotel_id = request.session.get("hotel_id")
+    context, notices, invalid_cursor = _reservations_table(db, hotel_id, filters, request.url)
+
+    for category, message in notices:
+        add_flash_message(request, message, category)
+    if invalid_cursor:
+        return RedirectResponse(url=str(request.url.remove_query_params("cursor")), status_code=303)
+    if context["has_filter"] and not filters["cursor"] and not context["reservations"]:
+        return RedirectResponse(url='/dashboard_reservations', status_code=303)
              
     return render(
         templates,
         request,
         "dashboard/reservations/reservations.html",
-        {
-            "request": request,
-            "reservations": reservations,
-            "hotel_id": hotel_id,
-            "has_filter": True if (search or room or status or (interval_in and check_in) or (interval_out and check_out)) else False
-        }
+        {"request": request, **context}
+    )
+
+@router.get("/table", response_class=HTMLResponse, include_in_schema=False)
+def reservations_table(
+    request: Request,
+    db: Session = Depends(get_db),
+    filters: dict = Depends(_reservation_filters)
+):
+    """Only the reservations table, for the filters applied without reloading the page."""
+    hotel_id = request.session.get("hotel_id")
+    page_url = request.url_for("reservations").replace(query=request.url.query)
+    context, notices, _ = _reservations_table(db, hotel_id, filters, page_url)
+    return render(
+        templates,
+        request,
+        "dashboard/reservations/table.html",
+        {"request": request, "notices": notices, **context}
     )
 
 @router.get("/new", response_class=HTMLResponse, include_in_schema=False)
@@ -191,39 +261,25 @@ def check_availability(
     # Hóspede específico
     guest_conflict = None
     if guest_id:
-        guest_conflict = db.query(Reservations).filter(
-            Reservations.status.not_in(["canceled", "checked_out"]),
-            Reservations.guest_id == guest_id,
-            Reservations.check_in < check_out,
-            Reservations.check_out > check_in
-        ).first()
-        print(bool(guest_conflict))
+        guest_conflict = guest_has_conflict(db, hotel_id, guest_id, check_in, check_out)
         available_guests = []
     else:
         # Hóspedes disponíveis
-        reserved_guest_ids = db.query(Reservations.guest_id).filter(
-            Reservations.check_in < check_out,
-            Reservations.check_out > check_in,
-            Reservations.status.in_(["booked", "checked_in"])
-        ).subquery()
-
-        available_guests = db.query(Guest).filter(
-            Guest.hotel_id == hotel_id,
-            ~Guest.id.in_(reserved_guest_ids)
-        ).all()
+        reserved_guest_ids = busy_guests(db, hotel_id, check_in, check_out)
+        available_guests = [
+            g for g in db.query(Guest).filter(Guest.hotel_id == hotel_id).all()
+            if g.id not in reserved_guest_ids
+        ]
 
     # Quartos disponíveis
-    reserved_room_ids = db.query(Reservations.room_id).filter(
-        Reservations.status.in_(["booked", "checked_in"]),
-        Reservations.check_in < check_out,
-        Reservations.check_out > check_in
-    ).subquery()
-
-    available_rooms = db.query(Rooms).filter(
-        Rooms.hotel_id == hotel_id,
-        Rooms.status != "maintenance",
-        ~Rooms.id.in_(reserved_room_ids)
-    ).all()
+    reserved_room_ids = busy_rooms(db, hotel_id, check_in, check_out)
+    available_rooms = [
+        r for r in db.query(Rooms).filter(
+            Rooms.hotel_id == hotel_id,
+            Rooms.status != "maintenance"
+        ).all()
+        if r.id not in reserved_room_ids
+    ]
 
     return {
         "guest_conflict": bool(guest_conflict),
@@ -299,6 +355,22 @@ def update_reservation(
         "message": f"Reserva {reservation.id} atualizada."
     }
 
+@router.post("/update_batch", include_in_schema=False)
+def update_reservations_batch(
+    request: Request,
+    payload: ReservationBatchUpdate,
+    db: Session = Depends(get_db),
+):
+    hotel_id = request.session.get('hotel_id')
+    results = batch_update_reservations(payload.ids, hotel_id, db)
+    updated = sum(1 for r in results if r["status"])
+
+    return {
+        "updated": updated,
+        "results": results,
+        "message": f"{updated} de {len(results)} reservas atualizadas."
+    }
+
 @router.get('/manage/{reservation_id}', include_in_schema=False)
 def manage_reservation(
     request: Request,
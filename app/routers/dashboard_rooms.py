@@ -1,9 +1,9 @@
 from decimal import Decimal
-from app.core.config import SessionLocal
+from app.core.config import get_db
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from app.utils.templating import templates
 from sqlalchemy.orm import Session
 from passlib.hash import bcrypt
 from sqlalchemy import case
@@ -12,7 +12,11 @@ from app.core.security import generate_csrf_token, validate_csrf_token
 from app.utils.flash import add_flash_message, render
 from app.utils.session_guard import require_session
 from app.schemas.rooms import RoomOut, RoomCreate, RoomsBase
-from app.models.rooms import Rooms
+from app.models.rooms import Rooms, ROOM_CAPACITIES
+from app.utils.etag import table_etag, is_not_modified, not_modified_response, set_etag
+from app.helpers.reports.daily_occupancy import record_room_change, record_room_removal
+from app.helpers.reservations.availability_index import invalidate_hotel
+from app.services.broadcast import publish_room
 
 router = APIRouter(
     prefix="/dashboard_rooms",
@@ -21,24 +25,23 @@ router = APIRouter(
 )
 
 api_router = APIRouter(prefix="/api", tags=["api_rooms"])
-templates = Jinja2Templates(directory="app/templates")
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @api_router.get("/get_rooms", response_model=List[RoomOut])
 def get_rooms(
     request: Request,
+    response: Response,
     hotel_id: Optional[str] = Query(None, description="Filtrar pelo ID do hotel"),
     db: Session = Depends(get_db)
 ):
     if request.session.get("Hotel_id"):
         if request.session.get("Hotel_id") != hotel_id:
             return HTTPException(status_code=404, detail="Erro!")
+
+    # responde 304 antes de carregar qualquer quarto
+    etag = table_etag(db, "rooms", request, hotel_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     query = db.query(Rooms)
 
     if hotel_id:
@@ -48,12 +51,11 @@ def get_rooms(
 
     if not rooms:
         raise HTTPException(status_code=404, detail="Nenhum quarto encontrado")
-    
+
+    set_etag(response, etag)
     return rooms
 
-@router.get("", response_class=HTMLResponse, include_in_schema=False)
-def rooms(
-    request: Request,
+def _room_filters(
     criteria: Optional[str] = Query("", description="Critério de ordenação"),
     order: Optional[str] = Query("", description="Ordem de exibição"),
     solteiro: Optional[bool] = Query(False),
@@ -64,47 +66,41 @@ def rooms(
     personalizado: Optional[bool] = Query(False),
     available: Optional[bool] = Query(False),
     occupied: Optional[bool] = Query(False),
-    maintenance: Optional[bool] = Query(False),
-    db: Session = Depends(get_db)
-):
-    
-    # captura o hotel
-    hotel_id = request.session.get("hotel_id")
+    maintenance: Optional[bool] = Query(False)
+) -> dict:
+    return {
+        "criteria": criteria, "order": order,
+        "solteiro": solteiro, "duplo": duplo, "casal": casal, "triplo": triplo,
+        "triplo_com_casal": triplo_com_casal, "personalizado": personalizado,
+        "available": available, "occupied": occupied, "maintenance": maintenance,
+    }
 
-    # valida o hotel
-    if not hotel_id:
-        add_flash_message(request, "Hotel não reconhecido", "warning")
-        return RedirectResponse(url="/dashboard_rooms", status_code=303)
+
+def _filtered_rooms(db: Session, hotel_id, filters: dict):
+    """Rooms of the hotel for the filter form; returns (rooms, has_filter), rooms is None if the hotel has none."""
+    criteria, order = filters["criteria"], filters["order"]
 
     # inicia a query
     query = db.query(Rooms).filter_by(hotel_id=hotel_id)
     if not query.first():
-        return render(
-            templates,
-            request,
-            "dashboard/rooms/rooms.html",
-            {
-                "rooms": [],
-                "has_filter": False
-            }
-        )
+        return None, False
 
     # aplica os filtros
     room_types = []
-    if solteiro:
+    if filters["solteiro"]:
         room_types.append("1")
-    if duplo:
+    if filters["duplo"]:
         room_types.append("2")
         room_types.append("3")
-    if casal:
+    if filters["casal"]:
         room_types.append("4")
-    if triplo:
+    if filters["triplo"]:
         room_types.append("5")
         room_types.append("6")
         room_types.append("7")
-    if triplo_com_casal:
+    if filters["triplo_com_casal"]:
         room_types.append("8")
-    if personalizado:
+    if filters["personalizado"]:
         room_types.append("9")
     
     if room_types:
@@ -112,11 +108,11 @@ def rooms(
 
     # filtra pela situação
     statuses = []
-    if available:
+    if filters["available"]:
         statuses.append("available")
-    if occupied:
+    if filters["occupied"]:
         statuses.append("occupied")
-    if maintenance:
+    if filters["maintenance"]:
         statuses.append("maintenance")
 
     if statuses:
@@ -151,11 +147,40 @@ def rooms(
 
     # executa a query
     rooms = query.order_by(Rooms.is_active.desc()).all()
+    return rooms, bool(criteria or order or room_types or statuses)
+
+
+@router.get("", response_class=HTMLResponse, include_in_schema=False)
+def rooms(
+    request: Request,
+    filters: dict = Depends(_room_filters),
+    db: Session = Depends(get_db)
+):
+    
+    # captura o hotel
+    hotel_id = request.session.get("hotel_id")
+
+    # valida o hotel
+    if not hotel_id:
+        add_flash_message(request, "Hotel não reconhecido", "warning")
+        return RedirectResponse(url="/dashboard_rooms", status_code=303)
+
+    rooms, has_filter = _filtered_rooms(db, hotel_id, filters)
+    if rooms is None:
+        return render(
+            templates,
+            request,
+            "dashboard/rooms/rooms.html",
+            {
+                "rooms": [],
+                "has_filter": False
+            }
+        )
+
     if not rooms:
         add_flash_message(request, "Nenhum quarto encontrado com esses filtros.", "warning")
         return RedirectResponse(url="/dashboard_rooms", status_code=303)
-    if criteria or order or room_types or statuses:
-        has_filter = True
+    if has_filter:
         add_flash_message(request, f"Filtro aplicado: {len(rooms)} quartos encontrados.", "info")
     return render(
         templates,
@@ -163,7 +188,34 @@ def rooms(
         "dashboard/rooms/rooms.html",
         {
             "rooms": rooms,
-            "has_filter": has_filter if (criteria or order or room_types or statuses) else False
+            "has_filter": has_filter
+        }
+    )
+
+@router.get("/table", response_class=HTMLResponse, include_in_schema=False)
+def rooms_table(
+    request: Request,
+    filters: dict = Depends(_room_filters),
+    db: Session = Depends(get_db)
+):
+    """Only the rooms table, for the filters applied without reloading the page."""
+    hotel_id = request.session.get("hotel_id")
+    rooms, has_filter = _filtered_rooms(db, hotel_id, filters)
+
+    notices = []
+    if rooms is not None and has_filter:
+        if rooms:
+            notices.append(("info", f"Filtro aplicado: {len(rooms)} quartos encontrados."))
+        else:
+            notices.append(("warning", "Nenhum quarto encontrado com esses filtros."))
+    return render(
+        templates,
+        request,
+        "dashboard/rooms/table.html",
+        {
+            "rooms": rooms or [],
+            "has_filter": has_filter,
+            "notices": notices
         }
     )
 
@@ -204,19 +256,8 @@ def create_room(
         return RedirectResponse(url="/dashboard_rooms", status_code=303)
 
     # define a capacidade com base no tipo do quarto (pra não depender dos dados do form)
-    room_capacities = {
-    "1": [1, 0],
-    "2": [1, 1],
-    "3": [2, 0],
-    "4": [2, 0],
-    "5": [1, 2],
-    "6": [2, 1],
-    "7": [3, 0],
-    "8": [2, 1],
-}
-    
-    if room_type in room_capacities:
-        capacity_adults, capacity_children = room_capacities[room_type]
+    if room_type in ROOM_CAPACITIES:
+        capacity_adults, capacity_children = ROOM_CAPACITIES[room_type]
     elif room_type == "9":
         # se o tipo for personalizado, depende dos dados do form
         if capacity_adults is None or capacity_children is None:
@@ -249,6 +290,7 @@ def create_room(
     db.add(new_room)
     db.commit()
     db.refresh(new_room)
+    publish_room(new_room)
     add_flash_message(request, f"Quarto {room_number} criado com sucesso. Clique <a href='/dashboard_rooms/edit/{new_room.id}'>aqui</a> para editá-lo.", "success")
     return RedirectResponse(url="/dashboard_rooms", status_code=303)
 
@@ -305,19 +347,8 @@ def update_room(
         return RedirectResponse(url="/dashboard_rooms", status_code=303)
     
     # define a capacidade com base no tipo do quarto (pra não depender dos dados do form)
-    room_capacities = {
-        "1": [1, 0],
-        "2": [1, 1],
-        "3": [2, 0],
-        "4": [2, 0],
-        "5": [1, 2],
-        "6": [2, 1],
-        "7": [3, 0],
-        "8": [2, 1],
-    }
-    
-    if room_type in room_capacities:
-        capacity_adults, capacity_children = room_capacities[room_type]
+    if room_type in ROOM_CAPACITIES:
+        capacity_adults, capacity_children = ROOM_CAPACITIES[room_type]
     elif room_type == "9":
         # se o tipo for personalizado, depende dos dados do form
         if capacity_adults is None or capacity_children is None:
@@ -333,6 +364,8 @@ def update_room(
     # formata o preço pra decimal
     price = Decimal(price)
 
+    old_type, old_price = room.type, room.price
+
     # atualiza os dados do quarto
     room.room_number = room_number
     room.type = room_type
@@ -343,8 +376,10 @@ def update_room(
     room.is_active = is_active
     room.comments = comments
 
+    record_room_change(db, room, old_type, old_price)
     db.commit()
     db.refresh(room)
+    publish_room(room)
     add_flash_message(request, f"Quarto {room.room_number} atualizado com sucesso.", "success")
     return RedirectResponse(url="/dashboard_rooms", status_code=303)
 
@@ -362,7 +397,11 @@ def delete_room(room_id: int, request: Request, db: Session = Depends(get_db
         add_flash_message(request, "O quarto não pode ser modificado enquanto ele estiver ocupado", 'warning')
         return RedirectResponse(url="/dashboard_rooms", status_code=303)
     
+    record_room_removal(db, room)
     db.delete(room)
     db.commit()
+    # as reservas do quarto saem pelo ON DELETE CASCADE, que o índice não vê
+    invalidate_hotel(room.hotel_id)
+    publish_room(room, deleted=True)
     add_flash_message(request, f"Quarto {room.room_number} excluído com sucesso.", "success")
     return RedirectResponse(url="/dashboard_rooms", status_code=303)
\ No newline at end of file
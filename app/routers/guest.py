@@ -3,24 +3,16 @@ from fastapi import FastAPI, HTTPException, Query, Request, Form, Depends, APIRo
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from validate_docbr import CPF
-from fastapi.templating import Jinja2Templates
+from app.utils.templating import templates
 
-from app.core.config import SessionLocal
+from app.core.config import get_db
 from app.schemas.guest import GuestCreate, GuestOut
 from app.models.guest import Guest
 from app.core.security import validate_csrf_token, generate_csrf_token
 
-templates = Jinja2Templates(directory="app/templates")
 router = APIRouter(prefix="/guests", tags=["guests"])
 api_router = APIRouter(prefix="/api", tags=["api_guests"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # @api_router.get("/get_guests", response_model=List[GuestOut])
 # def get_guests(
 #     cpf: Optional[str] = Query(None, description="Filtrar pelo CPF do hóspede"),
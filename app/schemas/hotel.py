@@ -8,8 +8,8 @@ class HotelBase(BaseModel):
     city: str = Field(..., example="Cityville")
     state: str = Field(..., example="Stateburg")
     zip_code: str = Field(..., example="12345")
-    phone_number: str = Field(None, example="+1234567890")
-    email: EmailStr = Field(None, example="info@grandplaza.com")
+    phone_number: str | None = Field(None, example="+1234567890")
+    email: EmailStr | None = Field(None, example="info@grandplaza.com")
     cnpj: str = Field(..., example="12.345.678/0001-99")
 
 class HotelCreate(HotelBase):
@@ -1,10 +1,12 @@
-from pydantic import BaseModel, EmailStr
+import datetime
+from typing import List
+from pydantic import BaseModel, EmailStr, Field
 
 class ReservationBase(BaseModel):
     guest_id: int
     room_id: int
-    check_in: str
-    check_out: str
+    check_in: datetime.datetime
+    check_out: datetime.datetime
     status: str
 
 class ReservationCreate(ReservationBase):
@@ -14,4 +16,7 @@ class ReservationOut(ReservationBase):
     id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ReservationBatchUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=200, example=[12, 13, 14])
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import uuid
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger("roomcontrol.broadcast")
+
+# "memory" entrega só no próprio processo; "unix" usa sockets de datagrama num diretório
+# compartilhado para alcançar todos os workers do uvicorn na mesma máquina
+BROADCAST_BACKEND = os.getenv("BROADCAST_BACKEND", "memory")
+BROADCAST_DIR = os.getenv("BROADCAST_DIR", os.path.join(tempfile.gettempdir(), "roomcontrol-broadcast"))
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "100"))
+
+
+class MemoryBroadcastBackend:
+    """Delivers messages to the subscribers of the current process only."""
+
+    def __init__(self):
+        self._deliver = None
+        self._loop = None
+
+    async def start(self, deliver):
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+
+    async def close(self):
+        self._deliver = None
+
+    def publish(self, message: bytes):
+        if self._deliver is not None:
+            self._loop.call_soon_threadsafe(self._deliver, message)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, deliver):
+        self.deliver = deliver
+
+    def datagram_received(self, data, addr):
+        self.deliver(data)
+
+
+class UnixSocketBroadcastBackend:
+    """Fan-out across local worker processes through Unix datagram sockets.
+
+    Each worker binds `<directory>/<uuid>.sock` and publishing sends the message to
+    every socket in the directory, its own included. Sockets left behind by dead
+    workers refuse the datagram and are removed.
+    """
+
+    def __init__(self, directory: str = BROADCAST_DIR):
+        self.directory = directory
+        self.path = None
+        self._transport = None
+        self._sender = None
+        self._send_lock = threading.Lock()
+
+    async def start(self, deliver):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{uuid.uuid4().hex}.sock")
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _DatagramProtocol(deliver), local_addr=self.path, family=socket.AF_UNIX
+        )
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def publish(self, message: bytes):
+        if self._sender is None:
+            return
+        try:
+            peers = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith(".sock")]
+        except FileNotFoundError:
+            return
+        with self._send_lock:
+            for peer in peers:
+                try:
+                    self._sender.sendto(message, peer)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # worker encerrado sem remover o socket
+                    try:
+                        os.unlink(peer)
+                    except FileNotFoundError:
+                        pass
+                except BlockingIOError:
+                    logger.warning("Fila do worker %s cheia; evento descartado", peer)
+
+
+class Broadcaster:
+    """Per-hotel pub/sub for live board events.
+
+    `publish` can be called from any thread (the sync endpoints run in the threadpool,
+    the scheduler in its own thread); subscribers are asyncio queues in the event loop.
+    A subscriber that falls behind gets a single "resync" event instead of a backlog.
+    """
+
+    def __init__(self, backend, queue_size: int = BROADCAST_QUEUE_SIZE):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._started = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        await self.backend.start(self._deliver)
+        self._started = True
+
+    async def close(self):
+        self._started = False
+        await self.backend.close()
+
+    def publish(self, hotel_id, event: dict):
+        if not self._started or hotel_id is None:
+            return
+        message = json.dumps({"hotel_id": int(hotel_id), "event": event}, default=str)
+        with self._lock:
+            self.published += 1
+        self.backend.publish(message.encode())
+
+    def _deliver(self, data: bytes):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        for queue in list(self._subscribers.get(message.get("hotel_id"), ())):
+            try:
+                queue.put_nowait(message["event"])
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    @asynccontextmanager
+    async def subscribe(self, hotel_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(int(hotel_id), set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(int(hotel_id))
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[int(hotel_id)]
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def _default_backend():
+    if BROADCAST_BACKEND == "unix":
+        return UnixSocketBroadcastBackend()
+    return MemoryBroadcastBackend()
+
+
+broadcaster = Broadcaster(_default_backend())
+
+
+def reservation_event(reservation_id, status, room_id, room_status=None, check_in=None, check_out=None, guest_id=None) -> dict:
+    return {
+        "type": "reservation",
+        "id": reservation_id,
+        "status": status,
+        "room_id": room_id,
+        "room_status": room_status,
+        "check_in": check_in.isoformat() if check_in else None,
+        "check_out": check_out.isoformat() if check_out else None,
+        "guest_id": guest_id,
+    }
+
+
+def publish_reservation(hotel_id, reservation, room=None):
+    broadcaster.publish(hotel_id, reservation_event(
+        reservation.id, reservation.status, reservation.room_id,
+        room.status if room is not None else None,
+        reservation.check_in, reservation.check_out, reservation.guest_id,
+    ))
+
+
+def publish_room(room, deleted: bool = False):
+    if deleted:
+        broadcaster.publish(room.hotel_id, {"type": "room_deleted", "id": room.id})
+        return
+    broadcaster.publish(room.hotel_id, {
+        "type": "room",
+        "id": room.id,
+        "room_number": room.room_number,
+        "status": room.status,
+        "is_active": room.is_active,
+    })
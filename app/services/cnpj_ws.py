@@ -1,31 +1,160 @@
 from __future__ import annotations
+import asyncio
+import os
+import time
 import httpx
 
+from app.utils.metrics import CNPJ_LOOKUP_LATENCY
+from app.utils.ttl_cache import TTLCache
+
 CNPJ_WS_PUBLIC = "https://publica.cnpj.ws/cnpj/{cnpj}"
 
+# "http" consulta a API pública; "stub" responde localmente (testes/offline)
+CNPJ_WS_BACKEND = os.getenv("CNPJ_WS_BACKEND", "http")
+CNPJ_WS_TIMEOUT = float(os.getenv("CNPJ_WS_TIMEOUT", "6.0"))
+CNPJ_WS_CACHE_TTL = float(os.getenv("CNPJ_WS_CACHE_TTL", "86400"))
+CNPJ_WS_NEGATIVE_TTL = float(os.getenv("CNPJ_WS_NEGATIVE_TTL", "600"))
+CNPJ_WS_MAX_CONNECTIONS = int(os.getenv("CNPJ_WS_MAX_CONNECTIONS", "10"))
+
 class CNPJWsError(Exception):
-    pass
-
-async def fetch_cnpj_situacao(cnpj_digits: str, timeour_s: float = 6.0) -> str:
-    url = CNPJ_WS_PUBLIC.format(cnpj=cnpj_digits)
-
-    try:
-        async with httpx.AsyncClient(timeout=timeour_s, follow_redirects=True) as client:
-            res = await client.get(url, headers={"Accept": "application/json"})
-    except httpx.RequestError as e:
-        raise CNPJWsError(f"Falha na conexão com a API CPNJ.ws: {e}") from e
-    
-    if res.status_code == 404:
-        raise CNPJWsError("O CNPJ não foi encontrado na base pública.")
-    if res.status_code == 429:
-        raise CNPJWsError("Limite de consultas atingido. Tente novamente mais tarde.")
-    if res.status_code >= 400:
-        raise CNPJWsError(f"Erro da API CNPJ.ws ({res.status_code}).")
-    
-    data = res.json()
-    est = data.get("estabelecimento") or {}
-    situ = (est.get("situacao_cadastral") or "").strip()
-
-    if not situ:
-        raise CNPJWsError("Não foi possível validar a situação do CNPJ.")
-    return situ
\ No newline at end of file
+    def __init__(self, message: str, cacheable: bool = False):
+        super().__init__(message)
+        # erros definitivos (ex. CNPJ inexistente) podem ir para o cache negativo
+        self.cacheable = cacheable
+
+
+class HttpCNPJBackend:
+    """Queries the public CNPJ.ws API through a long-lived pooled client."""
+
+    def __init__(self, timeout_s: float = CNPJ_WS_TIMEOUT):
+        self.timeout_s = timeout_s
+        self.client: httpx.AsyncClient | None = None
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                follow_redirects=True,
+                headers={"Accept": "application/json"},
+                limits=httpx.Limits(
+                    max_connections=CNPJ_WS_MAX_CONNECTIONS,
+                    max_keepalive_connections=CNPJ_WS_MAX_CONNECTIONS,
+                ),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch(self, cnpj_digits: str) -> str:
+        await self.start()
+        url = CNPJ_WS_PUBLIC.format(cnpj=cnpj_digits)
+
+        try:
+            res = await self.client.get(url)
+        except httpx.RequestError as e:
+            raise CNPJWsError(f"Falha na conexão com a API CPNJ.ws: {e}") from e
+
+        if res.status_code == 404:
+            raise CNPJWsError("O CNPJ não foi encontrado na base pública.", cacheable=True)
+        if res.status_code == 429:
+            raise CNPJWsError("Limite de consultas atingido. Tente novamente mais tarde.")
+        if res.status_code >= 400:
+            raise CNPJWsError(f"Erro da API CNPJ.ws ({res.status_code}).")
+
+        data = res.json()
+        est = data.get("estabelecimento") or {}
+        situ = (est.get("situacao_cadastral") or "").strip()
+
+        if not situ:
+            raise CNPJWsError("Não foi possível validar a situação do CNPJ.", cacheable=True)
+        return situ
+
+
+class StubCNPJBackend:
+    """Local backend: answers from a dict, `default` for unknown CNPJs (None = not found)."""
+
+    def __init__(self, situations: dict[str, str] | None = None, default: str | None = "Ativa"):
+        self.situations = situations or {}
+        self.default = default
+        self.calls = 0
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def fetch(self, cnpj_digits: str) -> str:
+        self.calls += 1
+        situ = self.situations.get(cnpj_digits, self.default)
+        if situ is None:
+            raise CNPJWsError("O CNPJ não foi encontrado na base pública.", cacheable=True)
+        return situ
+
+
+class CNPJService:
+    """CNPJ situation lookups with TTL cache, negative cache and single-flight."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.cache = TTLCache(ttl=CNPJ_WS_CACHE_TTL)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def start(self):
+        await self.backend.start()
+
+    async def close(self):
+        await self.backend.close()
+
+    async def situacao(self, cnpj_digits: str) -> str:
+        cached = self.cache.get(cnpj_digits)
+        if isinstance(cached, CNPJWsError):
+            raise cached
+        if cached is not None:
+            return cached
+
+        # consultas simultâneas do mesmo CNPJ aguardam a mesma requisição
+        future = self._inflight.get(cnpj_digits)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cnpj_digits] = future
+        start = time.perf_counter()
+        try:
+            situ = await self.backend.fetch(cnpj_digits)
+        except CNPJWsError as e:
+            CNPJ_LOOKUP_LATENCY.labels("error").observe(time.perf_counter() - start)
+            if e.cacheable:
+                self.cache.set(cnpj_digits, e, ttl=CNPJ_WS_NEGATIVE_TTL)
+            future.set_exception(e)
+            # evita o aviso de exceção não recuperada quando ninguém mais aguardava
+            future.exception()
+            raise
+        except BaseException as e:
+            CNPJ_LOOKUP_LATENCY.labels("error").observe(time.perf_counter() - start)
+            future.set_exception(CNPJWsError(f"Falha na consulta do CNPJ: {e}"))
+            future.exception()
+            raise
+        else:
+            CNPJ_LOOKUP_LATENCY.labels("ok").observe(time.perf_counter() - start)
+            self.cache.set(cnpj_digits, situ)
+            future.set_result(situ)
+            return situ
+        finally:
+            self._inflight.pop(cnpj_digits, None)
+
+
+def _default_backend():
+    if CNPJ_WS_BACKEND == "stub":
+        return StubCNPJBackend()
+    return HttpCNPJBackend()
+
+
+cnpj_service = CNPJService(_default_backend())
+
+
+async def fetch_cnpj_situacao(cnpj_digits: str) -> str:
+    return await cnpj_service.situacao(cnpj_digits)
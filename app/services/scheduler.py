@@ -0,0 +1,264 @@
+from __future__ import annotations
+import asyncio
+import datetime
+import logging
+import os
+import threading
+
+from sqlalchemy import exists, select, text, update
+
+from app.core.config import SessionLocal, engine
+from app.models.reservations import Reservations
+from app.models.rooms import Rooms
+from app.helpers.reservations.availability_index import invalidate_hotel
+from app.helpers.reports.dashboard_kpis import invalidate_kpis
+from app.services.broadcast import broadcaster, reservation_event
+from app.utils.etag import bump_versions
+from app.helpers.reports.daily_occupancy import add_stay, apply_deltas, new_deltas
+
+logger = logging.getLogger("roomcontrol.scheduler")
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_INTERVAL = float(os.getenv("SCHEDULER_INTERVAL", "300"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "500"))
+# reservas não iniciadas são canceladas (no-show) depois do check-out previsto + tolerância
+SCHEDULER_NO_SHOW_GRACE_HOURS = float(os.getenv("SCHEDULER_NO_SHOW_GRACE_HOURS", "0"))
+# hospedagens vencidas recebem check-out automático depois da tolerância
+SCHEDULER_AUTO_CHECKOUT = os.getenv("SCHEDULER_AUTO_CHECKOUT", "true").lower() in ("1", "true", "yes")
+SCHEDULER_CHECKOUT_GRACE_HOURS = float(os.getenv("SCHEDULER_CHECKOUT_GRACE_HOURS", "12"))
+
+LEADER_LOCK_NAME = "roomcontrol_scheduler"
+
+
+class SchedulerMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.errors = 0
+        self.rows = {"no_show": 0, "auto_checkout": 0}
+        self.last_run_at = None
+        self.last_duration_s = None
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "runs": self.runs,
+                "errors": self.errors,
+                "rows_processed": dict(self.rows),
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+                "last_duration_s": self.last_duration_s,
+            }
+
+
+class LeaderLock:
+    """Leader election across workers with a MySQL named lock (GET_LOCK).
+
+    The lock lives as long as the dedicated connection, so a crashed worker releases
+    it automatically and another worker takes over on its next tick.
+    """
+
+    def __init__(self, name: str = LEADER_LOCK_NAME):
+        self.name = name
+        self.connection = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.connection is not None
+
+    def acquire(self) -> bool:
+        if self.connection is not None:
+            try:
+                # confirma que a conexão (e com ela o lock) continua viva
+                self.connection.execute(text("SELECT 1"))
+                self.connection.commit()
+                return True
+            except Exception:
+                self.release()
+        connection = engine.connect()
+        try:
+            got = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": self.name}).scalar()
+            # o lock é da sessão, não da transação: não deixa a transação aberta
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if got == 1:
+            self.connection = connection
+            return True
+        connection.close()
+        return False
+
+    def release(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": self.name})
+        except Exception:
+            pass
+        finally:
+            self.connection.close()
+            self.connection = None
+
+
+def _transition_batches(db, status, cutoff, new_values, room_status, metric, metrics):
+    # seleciona um lote de ids vencidos e atualiza por id, até esgotar
+    total = 0
+    while True:
+        # trava as reservas do lote: um check-out manual ou outra rodada não aplica a mesma transição;
+        # as que outra transação já travou ficam para a próxima rodada
+        rows = db.query(
+            Reservations.id, Reservations.room_id, Reservations.guest_id, Reservations.check_in, Reservations.check_out,
+            Rooms.hotel_id, Rooms.type, Rooms.price
+        ) \
+            .join(Rooms, Rooms.id == Reservations.room_id) \
+            .filter(Reservations.status == status) \
+            .filter(Reservations.check_out < cutoff) \
+            .order_by(Reservations.id) \
+            .limit(SCHEDULER_BATCH_SIZE) \
+            .with_for_update(skip_locked=True, of=Reservations) \
+            .all()
+        if not rows:
+            break
+
+        ids = [row.id for row in rows]
+        db.execute(
+            update(Reservations)
+            .where(Reservations.id.in_(ids))
+            .where(Reservations.status == status)
+            .values(**new_values)
+            .execution_options(synchronize_session=False)
+        )
+        deltas = new_deltas()
+        for row in rows:
+            add_stay(deltas, row.hotel_id, row.type, row.price, status, row.check_in, row.check_out, sign=-1)
+            add_stay(deltas, row.hotel_id, row.type, row.price, new_values["status"], row.check_in,
+                     new_values.get("check_out", row.check_out))
+        apply_deltas(db, deltas)
+
+        freed = set()
+        if room_status:
+            # só libera quartos ainda ocupados e sem outra hospedagem em andamento
+            # (quartos em manutenção ou já ocupados por uma estadia mais nova ficam como estão)
+            freed = set(db.scalars(
+                select(Rooms.id)
+                .where(Rooms.id.in_({row.room_id for row in rows}))
+                .where(Rooms.status == 'occupied')
+                .where(~exists().where(Reservations.room_id == Rooms.id).where(Reservations.status == 'checked_in'))
+                .with_for_update()
+            ))
+            if freed:
+                db.execute(
+                    update(Rooms)
+                    .where(Rooms.id.in_(freed))
+                    .values(status=room_status)
+                    .execution_options(synchronize_session=False)
+                )
+        hotel_ids = {row.hotel_id for row in rows}
+        keys = [("reservations", hotel_id) for hotel_id in hotel_ids]
+        keys += [("rooms", row.hotel_id) for row in rows if row.room_id in freed]
+        bump_versions(db, keys)
+        db.commit()
+
+        for hotel_id in hotel_ids:
+            invalidate_hotel(hotel_id)
+            invalidate_kpis(hotel_id)
+        for row in rows:
+            broadcaster.publish(row.hotel_id, reservation_event(
+                row.id, new_values["status"], row.room_id, room_status if row.room_id in freed else None,
+                row.check_in, new_values.get("check_out", row.check_out), row.guest_id,
+            ))
+        total += len(rows)
+        with metrics.lock:
+            metrics.rows[metric] += len(rows)
+        if len(rows) < SCHEDULER_BATCH_SIZE:
+            break
+    return total
+
+
+def run_due_transitions(metrics: SchedulerMetrics) -> dict:
+    now = datetime.datetime.now()
+    processed = {}
+    db = SessionLocal()
+    try:
+        processed["no_show"] = _transition_batches(
+            db,
+            status="booked",
+            cutoff=now - datetime.timedelta(hours=SCHEDULER_NO_SHOW_GRACE_HOURS),
+            new_values={"status": "canceled"},
+            room_status=None,
+            metric="no_show",
+            metrics=metrics,
+        )
+        if SCHEDULER_AUTO_CHECKOUT:
+            processed["auto_checkout"] = _transition_batches(
+                db,
+                status="checked_in",
+                cutoff=now - datetime.timedelta(hours=SCHEDULER_CHECKOUT_GRACE_HOURS),
+                new_values={"status": "checked_out", "check_out": now},
+                room_status="available",
+                metric="auto_checkout",
+                metrics=metrics,
+            )
+    finally:
+        db.close()
+    return processed
+
+
+class ReservationScheduler:
+    """Periodic task, started from the app lifespan, that applies due transitions."""
+
+    def __init__(self, interval: float = SCHEDULER_INTERVAL):
+        self.interval = interval
+        self.leader = LeaderLock()
+        self.metrics = SchedulerMetrics()
+        self._task = None
+
+    def start(self):
+        if SCHEDULER_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.leader.release)
+
+    def _tick(self):
+        if not self.leader.acquire():
+            return None
+        started = datetime.datetime.now()
+        processed = run_due_transitions(self.metrics)
+        with self.metrics.lock:
+            self.metrics.runs += 1
+            self.metrics.last_run_at = started
+            self.metrics.last_duration_s = round((datetime.datetime.now() - started).total_seconds(), 3)
+        return processed
+
+    async def _loop(self):
+        while True:
+            try:
+                processed = await asyncio.to_thread(self._tick)
+                if processed and any(processed.values()):
+                    logger.info("Transições automáticas aplicadas: %s", processed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                with self.metrics.lock:
+                    self.metrics.errors += 1
+                logger.exception("Falha ao aplicar as transições automáticas")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SCHEDULER_ENABLED,
+            "interval_s": self.interval,
+            "is_leader": self.leader.is_leader,
+            **self.metrics.snapshot(),
+        }
+
+
+reservation_scheduler = ReservationScheduler()
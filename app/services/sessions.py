@@ -0,0 +1,286 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+from app.utils.private_paths import check_private_file, default_private_dir, private_dir
+
+logger = logging.getLogger("roomcontrol.sessions")
+
+# "cookie" mantém a sessão inteira no cookie assinado (SessionMiddleware do Starlette);
+# "memory" e "sqlite" guardam no servidor e o cookie leva só um id opaco.
+# "memory" serve para um único worker; "sqlite" é compartilhado pelos workers da máquina
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+# vazio: arquivo num diretório do usuário do app (0700) dentro do temp; um caminho informado
+# precisa estar num diretório do usuário do app, fechado aos outros
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "")
+SESSION_COOKIE = "session"
+SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", str(14 * 24 * 60 * 60)))
+SESSION_CLEANUP_INTERVAL = float(os.getenv("SESSION_CLEANUP_INTERVAL", "600"))
+# marca na sessão para o middleware trocar o id na resposta; nunca é gravada
+ROTATE_SESSION_KEY = "_rotate_id"
+
+
+class SessionStore:
+    """Base of the server-side stores: counters and the background cleanup of expired sessions.
+
+    Sessions are kept as JSON text with an absolute expiry timestamp. Subclasses implement
+    `load`, `save`, `delete`, `cleanup` and `count`; `blocking` stores run in a thread.
+    """
+
+    blocking = False
+
+    def __init__(self, cleanup_interval: float = SESSION_CLEANUP_INTERVAL):
+        self.cleanup_interval = cleanup_interval
+        self._task = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.writes = 0
+        self.skipped_writes = 0
+        self.expired = 0
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    async def start(self):
+        if self._task is None and self.cleanup_interval > 0:
+            self._task = asyncio.create_task(self._cleanup_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                removed = await asyncio.to_thread(self.cleanup) if self.blocking else self.cleanup()
+                if removed:
+                    logger.info("%d sessões expiradas removidas", removed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha ao remover as sessões expiradas")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "sessions": self.count(),
+            "loads": self.loads,
+            "writes": self.writes,
+            "skipped_writes": self.skipped_writes,
+            "expired": self.expired,
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in a dict of the current process; lost on restart."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions: dict[str, tuple[str, float]] = {}
+
+    def load(self, session_id: str):
+        self._count("loads")
+        record = self._sessions.get(session_id)
+        if record is None or record[1] <= time.time():
+            return None
+        return record
+
+    def save(self, session_id: str, data: str, expires: float):
+        self._count("writes")
+        self._sessions[session_id] = (data, expires)
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def cleanup(self) -> int:
+        now = time.time()
+        expired = [sid for sid, (_, expires) in list(self._sessions.items()) if expires <= now]
+        for sid in expired:
+            self._sessions.pop(sid, None)
+        self._count("expired", len(expired))
+        return len(expired)
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file (WAL), shared by the workers of the machine."""
+
+    blocking = True
+
+    def __init__(self, path: str = SESSION_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or os.path.join(default_private_dir("sessions"), "sessions.sqlite3")
+        self._local = threading.local()
+        self._connections = []
+
+    def _conn(self) -> sqlite3.Connection:
+        # uma conexão por thread do threadpool
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # os ids das sessões são credenciais: diretório e arquivo só do usuário do app,
+            # senão outro usuário da máquina poderia criá-los antes e ler ou forjar sessões
+            private_dir(os.path.dirname(os.path.abspath(self.path)))
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR | getattr(os, "O_NOFOLLOW", 0), 0o600)
+            try:
+                check_private_file(fd, self.path)
+            finally:
+                os.close(fd)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires)")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def close(self):
+        await super().close()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def load(self, session_id: str):
+        self._count("loads")
+        return self._conn().execute(
+            "SELECT data, expires FROM sessions WHERE id = ? AND expires > ?", (session_id, time.time())
+        ).fetchone()
+
+    def save(self, session_id: str, data: str, expires: float):
+        self._count("writes")
+        self._conn().execute("INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)", (session_id, data, expires))
+
+    def delete(self, session_id: str):
+        self._conn().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def cleanup(self) -> int:
+        removed = self._conn().execute("DELETE FROM sessions WHERE expires <= ?", (time.time(),)).rowcount
+        self._count("expired", removed)
+        return removed
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def _dump(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+
+class ServerSessionMiddleware:
+    """Drop-in for Starlette's SessionMiddleware backed by a SessionStore.
+
+    The cookie carries only a random id. The session is written back only when its
+    content changed, or when less than half of its lifetime is left (sliding expiry);
+    the cookie is sent only for new or renewed sessions. An emptied session
+    (`request.session.clear()`) is deleted and its cookie expired. After
+    `rotate_session(request)` the old record is deleted and the session is saved
+    under a new id.
+    """
+
+    def __init__(self, app, store: SessionStore, session_cookie: str = SESSION_COOKIE,
+                 max_age: int = SESSION_MAX_AGE, same_site: str = "lax", https_only: bool = False):
+        self.app = app
+        self.store = store
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.security_flags = "httponly; samesite=" + same_site + ("; secure" if https_only else "")
+
+    async def _call(self, method, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        session_id = HTTPConnection(scope).cookies.get(self.session_cookie)
+        record = await self._call(self.store.load, session_id) if session_id else None
+        if record is None:
+            session_id, initial, expires = None, "{}", 0.0
+        else:
+            initial, expires = record
+        scope["session"] = json.loads(initial)
+
+        if scope["type"] == "websocket":
+            # conexões longas só leem a sessão
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                await self._commit(scope["session"], session_id, initial, expires, MutableHeaders(scope=message))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _commit(self, session: dict, session_id, initial: str, expires: float, headers: MutableHeaders):
+        now = time.time()
+        rotate = session.pop(ROTATE_SESSION_KEY, False)
+        if not session:
+            if session_id is not None:
+                await self._call(self.store.delete, session_id)
+                headers.append("Set-Cookie", f"{self.session_cookie}=null; path=/; "
+                               f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}")
+            return
+
+        if rotate and session_id is not None:
+            # id conhecido antes do login (fixação de sessão): descarta e emite outro
+            await self._call(self.store.delete, session_id)
+            session_id = None
+
+        data = _dump(session)
+        renew = session_id is None or expires - now < self.max_age / 2
+        if data == initial and not renew:
+            self.store._count("skipped_writes")
+            return
+
+        if session_id is None:
+            session_id = secrets.token_urlsafe(32)
+        await self._call(self.store.save, session_id, data, now + self.max_age)
+        if renew:
+            headers.append("Set-Cookie", f"{self.session_cookie}={session_id}; path=/; "
+                           f"Max-Age={self.max_age}; {self.security_flags}")
+
+
+def rotate_session(request):
+    """Issue a new session id with this response; call when the session gets authenticated."""
+    # no backend cookie o conteúdo assinado já muda a cada login
+    if session_store is not None:
+        request.session[ROTATE_SESSION_KEY] = True
+
+
+def _default_store():
+    if SESSION_BACKEND == "memory":
+        return MemorySessionStore()
+    if SESSION_BACKEND == "sqlite":
+        return SQLiteSessionStore()
+    return None
+
+
+# None quando SESSION_BACKEND=cookie
+session_store = _default_store()
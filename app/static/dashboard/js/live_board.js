@@ -0,0 +1,76 @@
+// QUADRO AO VIVO: recebe as mudanças de quartos e reservas feitas em outros terminais
+// WebSocket em /dashboard_live/ws, com Server-Sent Events como alternativa
+const RETRY_MS = 3000;
+
+const ROOM_BADGES = {
+    available: '<span class="badge bg-success rounded-3 fw-semibold">Disponível</span>',
+    occupied: '<span class="badge bg-danger rounded-3 fw-semibold">Ocupado</span>',
+    maintenance: '<span class="badge bg-secondary rounded-3 fw-semibold">Manutenção</span>',
+};
+
+function dispatch(data) {
+    const event = JSON.parse(data);
+    if (event.type === "resync") {
+        // perdemos eventos: recarrega a página para não mostrar dados antigos
+        window.location.reload();
+        return;
+    }
+    document.dispatchEvent(new CustomEvent(`live:${event.type}`, { detail: event }));
+}
+
+function connectEventSource() {
+    const source = new EventSource("/dashboard_live/events");
+    source.onmessage = (message) => dispatch(message.data);
+}
+
+function connectWebSocket() {
+    const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+    const socket = new WebSocket(`${protocol}://${window.location.host}/dashboard_live/ws`);
+    let opened = false;
+
+    socket.onopen = () => { opened = true; };
+    socket.onmessage = (message) => dispatch(message.data);
+    socket.onclose = () => {
+        // se nunca abriu (proxy sem suporte a WebSocket), usa SSE
+        if (opened) {
+            setTimeout(connectWebSocket, RETRY_MS);
+        } else {
+            connectEventSource();
+        }
+    };
+}
+
+export function formatDateTime(iso) {
+    // mesmo formato do template: dd/mm/aaaa hh:mm
+    const [date, time] = iso.split("T");
+    const [year, month, day] = date.split("-");
+    return `${day}/${month}/${year} ${time.slice(0, 5)}`;
+}
+
+function patchRoomStatus(roomId, status) {
+    const cell = document.querySelector(`tr[data-room-id="${roomId}"] .room-status-cell h6`);
+    if (cell && ROOM_BADGES[status]) {
+        cell.innerHTML = ROOM_BADGES[status];
+    }
+}
+
+document.addEventListener("live:room", (e) => patchRoomStatus(e.detail.id, e.detail.status));
+
+document.addEventListener("live:room_deleted", (e) => {
+    const row = document.querySelector(`tr[data-room-id="${e.detail.id}"]`);
+    if (row && !row.dataset.reservationId) {
+        row.remove();
+    }
+});
+
+document.addEventListener("live:reservation", (e) => {
+    if (e.detail.room_status) {
+        patchRoomStatus(e.detail.room_id, e.detail.room_status);
+    }
+});
+
+if ("WebSocket" in window) {
+    connectWebSocket();
+} else {
+    connectEventSource();
+}
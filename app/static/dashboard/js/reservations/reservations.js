@@ -1,5 +1,7 @@
 import { showAlert } from '../alerts.js';
 import { checkoutButton, reservationButton } from './change_buttons.js';
+import { formatDateTime } from '../live_board.js';
+import { bindFragmentTable } from '../table_fragments.js';
 
 
 document.addEventListener("DOMContentLoaded", function () {
@@ -70,8 +72,36 @@ document.addEventListener("DOMContentLoaded", function () {
             }
         });
     }
+    // mudanças feitas em outros terminais (live_board.js)
+    document.addEventListener("live:reservation", function (e) {
+        const event = e.detail;
+        const row = document.querySelector(`tr[data-reservation-id="${event.id}"]`);
+        if (!row || row.dataset.status === event.status) return;
+
+        if (event.check_in) row.querySelector(".check-in-cell p").textContent = formatDateTime(event.check_in);
+        if (event.check_out) row.querySelector(".check-out-cell p").textContent = formatDateTime(event.check_out);
+
+        const status = row.querySelector(".status-cell p");
+        const link = row.querySelector(".btn-res-1");
+        if (event.status === "canceled") {
+            row.dataset.status = event.status;
+            status.textContent = "Cancelado";
+            status.className = "mb-0 fw-normal text-warning";
+            if (link) link.remove();
+        } else if (link) {
+            changeTable(link, status, event.id, link.dataset.name, event.guest_id, event.status, handleClick);
+        }
+    });
+
     // anexa os listeners ao carregar a página
     attachReservationButtons();
+
+    // filtros e paginação trocam só a tabela
+    bindFragmentTable(
+        document.getElementById("reservations-filter"),
+        document.getElementById("reservations-table"),
+        attachReservationButtons
+    );
 });
 
 // FUNÇÃO DE ATUALIZAR QUARTOS DO FILTRO UTILIZANDO A API
@@ -98,6 +128,7 @@ roomInput.addEventListener("focus", function () {
 
 // FUNÇÃO DE ALTERAR A TABELA AO ATUALIZAR A RESERVA
 function changeTable(link, status, reservationId, name, guest, reservationStatus, handleClick) {
+    link.closest("tr").dataset.status = reservationStatus;
     if (reservationStatus === "checked_in") {
         checkoutButton(status, reservationId, name, link, handleClick);
     } else if (reservationStatus === "checked_out") {
@@ -0,0 +1,64 @@
+// FILTROS SEM RECARREGAR A PÁGINA: busca só a tabela no endpoint de fragmento e troca o conteúdo
+// sem JavaScript o formulário continua enviando para a página inteira
+
+function queryString(form) {
+    const params = new URLSearchParams();
+    for (const [name, value] of new FormData(form)) {
+        if (value !== "") params.append(name, value);
+    }
+    return params.toString();
+}
+
+export function bindFragmentTable(form, container, onLoad = () => {}) {
+    const fragmentUrl = container.dataset.fragmentUrl;
+    const pagePath = new URL(form.action, window.location.href).pathname;
+    let controller = null;
+
+    async function load(query, push = true) {
+        const pageUrl = query ? `${pagePath}?${query}` : pagePath;
+        // cancela a busca anterior se o filtro mudar de novo
+        if (controller) controller.abort();
+        controller = new AbortController();
+
+        try {
+            const res = await fetch(query ? `${fragmentUrl}?${query}` : fragmentUrl, {
+                headers: { "X-Requested-With": "XMLHttpRequest" },
+                signal: controller.signal
+            });
+            // sessão expirada ou erro: segue o fluxo normal da página
+            if (res.redirected || !res.ok) {
+                window.location.href = res.redirected ? res.url : pageUrl;
+                return;
+            }
+            container.innerHTML = await res.text();
+        } catch (err) {
+            if (err.name !== "AbortError") window.location.href = pageUrl;
+            return;
+        }
+
+        if (push) history.pushState(null, "", pageUrl);
+        container.querySelectorAll(".toast").forEach(el => new bootstrap.Toast(el, { delay: 4000 }).show());
+        container.querySelectorAll('[data-bs-toggle="tooltip"]').forEach(el => new bootstrap.Tooltip(el));
+        onLoad(container);
+    }
+
+    form.addEventListener("submit", function (e) {
+        e.preventDefault();
+        load(queryString(form));
+    });
+
+    // paginação e "Limpar Filtros" apontam para a página; troca só a tabela
+    container.addEventListener("click", function (e) {
+        const link = e.target.closest("a[href]");
+        if (!link) return;
+        const url = new URL(link.href, window.location.href);
+        if (url.pathname !== pagePath) return;
+        e.preventDefault();
+        if (!url.search) form.reset();
+        load(url.search.slice(1));
+    });
+
+    window.addEventListener("popstate", function () {
+        load(window.location.search.slice(1), false);
+    });
+}
@@ -0,0 +1,94 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import event, func
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.models.table_versions import TableVersion
+from app.models.hotel import Hotel
+from app.models.rooms import Rooms
+from app.models.guest import Guest
+from app.models.reservations import Reservations
+
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+def bump_versions(db, keys):
+    """Increment the (table, hotel_id) counters in the current transaction.
+
+    `db` is a Session or Connection. Keys are sorted so concurrent transactions lock
+    the counter rows in the same order.
+    """
+    rows = [{"table_name": table, "hotel_id": hotel_id, "version": 1} for table, hotel_id in sorted(set(keys))]
+    if not rows:
+        return
+    stmt = insert(TableVersion).values(rows)
+    db.execute(stmt.on_duplicate_key_update(version=TableVersion.version + 1))
+
+
+def _hotel_of(session, obj):
+    if isinstance(obj, Hotel):
+        return obj.id
+    return obj.hotel_id
+
+
+_VERSIONED = {Hotel: "hotels", Rooms: "rooms", Guest: "guests", Reservations: "reservations"}
+# tabelas apagadas pelo ON DELETE CASCADE do banco, que o ORM não vê
+_CASCADES = {Rooms: ("reservations",), Guest: ("reservations",)}
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session, flush_context):
+    # writes feitos pelo ORM; os UPDATEs em lote chamam bump_versions diretamente
+    keys = set()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            table = _VERSIONED.get(type(obj))
+            if table is None or (obj in session.dirty and not session.is_modified(obj)):
+                continue
+            hotel_id = _hotel_of(session, obj)
+            if hotel_id is None:
+                continue
+            keys.add((table, hotel_id))
+            if obj in session.deleted:
+                keys.update((cascade, hotel_id) for cascade in _CASCADES.get(type(obj), ()))
+    bump_versions(session.connection(), keys)
+
+
+def table_etag(db, table: str, request: Request, hotel_id=None) -> str:
+    """Strong ETag for a listing of `table`, from its version counter and the query string.
+
+    Scoped to one hotel it costs a primary key lookup; without a hotel it uses the sum
+    of the table's counters, which grows on every write of any hotel.
+    """
+    if hotel_id:
+        version = db.query(TableVersion.version) \
+            .filter(TableVersion.table_name == table) \
+            .filter(TableVersion.hotel_id == hotel_id) \
+            .scalar() or 0
+        scope = str(hotel_id)
+    else:
+        version = db.query(func.coalesce(func.sum(TableVersion.version), 0)) \
+            .filter(TableVersion.table_name == table) \
+            .scalar()
+        scope = "all"
+    params = hashlib.sha1(str(sorted(request.query_params.multi_items())).encode()).hexdigest()[:16]
+    return f'"{table}-{scope}-{version}-{params}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
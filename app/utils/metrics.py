@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+# antes do prometheus_client: o config carrega o .env, e o modo multiprocesso é lido na importação
+from app.core.config import pool_metrics, pool_stats
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.staticfiles import StaticFiles
+
+logger = logging.getLogger("roomcontrol.metrics")
+
+# com vários workers do uvicorn: diretório compartilhado (vazio a cada subida) onde cada
+# processo grava suas métricas; o /metrics de qualquer worker soma todos
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+# token exigido em "Authorization: Bearer ..." no /metrics; vazio deixa aberto
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# intervalo (s) em que cada worker publica o estado do pool e dos caches
+METRICS_REFRESH_INTERVAL = float(os.getenv("METRICS_REFRESH_INTERVAL", "15"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "roomcontrol_http_requests_total", "HTTP requests.", ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "roomcontrol_http_request_duration_seconds", "HTTP request latency until the response ends.",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+CNPJ_LOOKUP_LATENCY = Histogram(
+    "roomcontrol_cnpj_lookup_duration_seconds", "Outbound CNPJ lookups (cache misses only).",
+    ["outcome"], buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 6.0, 10.0),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "roomcontrol_db_pool_connections", "Connections of the SQLAlchemy pool.", ["state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter("roomcontrol_db_pool_checkouts_total", "Pool checkouts.")
+DB_POOL_WAIT = Counter("roomcontrol_db_pool_wait_seconds_total", "Time spent waiting for a pool connection.")
+DB_POOL_TIMEOUTS = Counter("roomcontrol_db_pool_checkout_timeouts_total", "Pool checkouts that failed.")
+CACHE_REQUESTS = Counter(
+    "roomcontrol_cache_requests_total", "Lookups of the in-process caches.", ["cache", "result"],
+)
+CACHE_ENTRIES = Gauge(
+    "roomcontrol_cache_entries", "Entries of the in-process caches.", ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+def status_class(status: int) -> str:
+    return f"{status // 100}xx"
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route; raw paths would give one series per id."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # arquivos estáticos montados em /static e /dashboard
+    if isinstance(scope.get("endpoint"), StaticFiles):
+        return scope.get("root_path", "") + "/{path}"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Counts HTTP requests and observes their latency by method, route template and status class."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            labels = (scope["method"], route_label(scope), status_class(status))
+            HTTP_REQUESTS.labels(*labels).inc()
+            HTTP_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+
+
+class MetricsRefresher:
+    """Publishes the process-local state (pool and cache counters) into the Prometheus metrics.
+
+    Runs on every scrape and, in each worker, every METRICS_REFRESH_INTERVAL seconds, so the
+    workers that did not serve the scrape are at most one interval behind. Cumulative
+    counters are published as increments since the previous refresh.
+    """
+
+    def __init__(self, interval: float = METRICS_REFRESH_INTERVAL):
+        self.interval = interval
+        self._caches = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self._task = None
+
+    def watch_cache(self, name: str, cache):
+        """Export a TTLCache (anything with hits, misses and stats())."""
+        self._caches[name] = cache
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.refresh()
+        if PROMETHEUS_MULTIPROC_DIR:
+            # os gauges "live" deste processo deixam de ser somados
+            multiprocess.mark_process_dead(os.getpid())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Falha ao publicar as métricas do processo")
+
+    def _increment(self, key, metric, value):
+        delta = value - self._last.get(key, 0)
+        if delta > 0:
+            metric.inc(delta)
+        self._last[key] = value
+
+    def refresh(self):
+        with self._lock:
+            pool = pool_stats()
+            for state in ("checked_out", "checked_in", "overflow"):
+                # o overflow do QueuePool fica negativo enquanto o pool não enche
+                DB_POOL_CONNECTIONS.labels(state).set(max(pool[state], 0))
+            with pool_metrics.lock:
+                checkouts, wait_total, timeouts = pool_metrics.checkouts, pool_metrics.wait_total, pool_metrics.timeouts
+            self._increment("pool_checkouts", DB_POOL_CHECKOUTS, checkouts)
+            self._increment("pool_wait", DB_POOL_WAIT, wait_total)
+            self._increment("pool_timeouts", DB_POOL_TIMEOUTS, timeouts)
+
+            for name, cache in self._caches.items():
+                stats = cache.stats()
+                self._increment((name, "hit"), CACHE_REQUESTS.labels(name, "hit"), stats["hits"])
+                self._increment((name, "miss"), CACHE_REQUESTS.labels(name, "miss"), stats["misses"])
+                CACHE_ENTRIES.labels(name).set(stats["size"])
+
+
+metrics_refresher = MetricsRefresher()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition text of this process, or of all workers in multiprocess mode."""
+    metrics_refresher.refresh()
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=PROMETHEUS_MULTIPROC_DIR)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,74 @@
+import base64
+import datetime
+import json
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_page_size(limit) -> int:
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor inválido")
+    return [_decode_value(v) for v in values]
+
+
+def keyset_after(columns, values):
+    """Filter for rows strictly after `values` in the (ascending) order of `columns`.
+
+    Expanded as (a > x) OR (a = x AND b > y) OR ... so MySQL can use a range scan on
+    an index with the same column order.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, column > values[i]))
+    return or_(*clauses)
+
+
+def paginate(query, columns, key, cursor=None, limit=None):
+    """Apply keyset pagination to `query`, ordered by `columns`.
+
+    `columns` must end with a unique column (e.g. the primary key) and `key` extracts
+    their values from a result row. Returns the rows of the page and the cursor of the
+    next page (None on the last page).
+    """
+    limit = clamp_page_size(limit)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, len(columns))))
+    rows = query.order_by(*columns).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(key(rows[-1]))
+    return rows, None
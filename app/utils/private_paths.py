@@ -0,0 +1,45 @@
+import os
+import stat
+import tempfile
+
+
+def default_private_dir(name: str) -> str:
+    """Per-user directory under the temp dir, named like Jinja's default bytecode cache."""
+    suffix = f"-{os.getuid()}" if hasattr(os, "getuid") else ""
+    return os.path.join(tempfile.gettempdir(), f"roomcontrol-{name}{suffix}")
+
+
+def _check_private(path: str, st: os.stat_result, kind: str):
+    # no Windows não há uid nem bits de grupo/outros para conferir
+    if not hasattr(os, "getuid"):
+        return
+    if st.st_uid != os.getuid():
+        raise RuntimeError(f"{kind} {path} não pertence ao usuário do processo")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(f"{kind} {path} pode ser alterado por outros usuários")
+
+
+def private_dir(path: str) -> str:
+    """Create `path` with mode 0700, or check that the existing one is safe to trust.
+
+    Files in it are loaded as code or credentials, so the directory must be a real
+    directory owned by the current user and not writable by group or others.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f"{path} não é um diretório")
+    _check_private(path, st, "O diretório")
+    return path
+
+
+
+def check_private_file(fd: int, path: str):
+    """Check an open file: owned by the current user and not accessible to anyone else."""
+    st = os.fstat(fd)
+    _check_private(path, st, "O arquivo")
+    if hasattr(os, "getuid") and st.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise RuntimeError(f"O arquivo {path} pode ser lido por outros usuários")
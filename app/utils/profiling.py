@@ -0,0 +1,217 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from jinja2 import Template
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import engine
+
+logger = logging.getLogger("roomcontrol.profiling")
+
+# fração das requisições perfiladas (0 desativa, 1 perfila todas, útil em desenvolvimento)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+# consultas com o mesmo formato repetidas a partir deste número numa requisição são tratadas como N+1
+PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv("PROFILING_N_PLUS_ONE_THRESHOLD", "5"))
+# envia o cabeçalho Server-Timing nas requisições perfiladas; expõe os tempos a qualquer
+# cliente, por isso só ligado em desenvolvimento
+PROFILING_SERVER_TIMING = os.getenv("PROFILING_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+# arquivos estáticos não passam pelo banco nem pelos templates
+PROFILING_SKIP_PREFIXES = ("/static/", "/dashboard/")
+
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?|:\w+)(?:\s*,\s*(?:%s|\?|:\w+))*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with IN lists and literals collapsed, so repeated lookups compare equal."""
+    shape = _IN_LIST.sub("(?)", statement)
+    shape = _LITERAL.sub("?", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class RequestProfile:
+    """Database and template time of one request, filled by the hooks below."""
+
+    __slots__ = ("start", "queries", "db_time", "template_time", "templates", "shapes")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.templates = 0
+        self.shapes = Counter()
+
+    def repeated(self, threshold: int = PROFILING_N_PLUS_ONE_THRESHOLD) -> list:
+        """(count, shape) of the statements repeated at least `threshold` times."""
+        return [(count, shape) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self, total: float) -> str:
+        handler = max(total - self.db_time - self.template_time, 0.0)
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f"app;dur={handler * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+
+# a requisição perfilada da tarefa atual; o threadpool das rotas síncronas herda o contexto
+_current: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+
+
+def current_profile():
+    return _current.get()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None or not conn.info.get("profiling_start"):
+        return
+    profile.db_time += time.perf_counter() - conn.info["profiling_start"].pop()
+    profile.queries += 1
+    profile.shapes[statement_shape(statement)] += 1
+
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(context):
+    # a consulta que falhou não chega ao after_cursor_execute
+    if context.connection is not None and context.connection.info.get("profiling_start"):
+        context.connection.info["profiling_start"].pop()
+
+
+class ProfiledTemplate(Template):
+    """Template that adds its render time to the current request profile.
+
+    Includes and extends render through the parent template, so each page counts once.
+    Lazy loads run while rendering are left in the database time only.
+    """
+
+    def render(self, *args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return super().render(*args, **kwargs)
+        start, db_before = time.perf_counter(), profile.db_time
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            profile.template_time += time.perf_counter() - start - (profile.db_time - db_before)
+            profile.templates += 1
+
+
+class ProfilingStats:
+    """Totals of the sampled requests, exposed in /api/profiling_stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.sampled = 0
+        self.queries = 0
+        self.n_plus_one = 0
+        self.routes = Counter()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record(self, route: str, profile: RequestProfile, repeated: list):
+        with self._lock:
+            self.sampled += 1
+            self.queries += profile.queries
+            if repeated:
+                self.n_plus_one += 1
+                self.routes[route] += 1
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": PROFILING_SAMPLE_RATE,
+            "requests": self.requests,
+            "sampled": self.sampled,
+            "queries_per_request": round(self.queries / self.sampled, 2) if self.sampled else None,
+            "n_plus_one_requests": self.n_plus_one,
+            "n_plus_one_routes": dict(self.routes.most_common(20)),
+        }
+
+
+profiling_stats = ProfilingStats()
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route ("/dashboard_rooms/{room_id}"), or the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of the HTTP requests: SQL statements and time, template time.
+
+    Sampled responses get a Server-Timing header (db, tpl, app = the rest of the handler,
+    total) and a JSON log line on "roomcontrol.profiling"; statements repeated with the
+    same shape (N+1) are logged as a warning.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILING_SAMPLE_RATE, server_timing: bool = PROFILING_SERVER_TIMING):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(PROFILING_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        profiling_stats.count_request()
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    total = time.perf_counter() - profile.start
+                    MutableHeaders(scope=message).append("Server-Timing", profile.server_timing(total))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(scope, status, profile)
+
+    def _report(self, scope, status: int, profile: RequestProfile):
+        route = route_template(scope)
+        repeated = profile.repeated()
+        profiling_stats.record(route, profile, repeated)
+        logger.info(json.dumps({
+            "method": scope["method"],
+            "route": route,
+            "status": status,
+            "total_ms": round((time.perf_counter() - profile.start) * 1000, 1),
+            "db_ms": round(profile.db_time * 1000, 1),
+            "queries": profile.queries,
+            "template_ms": round(profile.template_time * 1000, 1),
+            "n_plus_one": [{"count": count, "statement": shape[:300]} for count, shape in repeated],
+        }, ensure_ascii=False))
+        for count, shape in repeated:
+            logger.warning("Possível N+1 em %s %s: %d consultas iguais: %s", scope["method"], route, count, shape[:300])
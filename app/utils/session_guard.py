@@ -1,17 +1,49 @@
+import os
 from fastapi import Request, HTTPException
 from fastapi.responses import RedirectResponse
-from app.core.config import SessionLocal
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import get_db
 from app.utils.flash import add_flash_message
+from app.utils.ttl_cache import TTLCache
 from app.models.hotel import Hotel
 from fastapi import Depends
 
+# cache da situação (ativo/inativo) dos hotéis, evita um SELECT por requisição
+hotel_status_cache = TTLCache(ttl=float(os.getenv("HOTEL_STATUS_CACHE_TTL", "30")))
+
+
+def invalidate_hotel_status(hotel_id):
+    hotel_status_cache.invalidate(hotel_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_hotels(session, flush_context):
+    # só marca: invalidar antes do commit deixaria outra requisição recarregar o valor antigo
+    changed = {obj.id for obj in session.dirty if isinstance(obj, Hotel) and session.is_modified(obj)}
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, Hotel))
+    if changed:
+        session.info.setdefault("changed_hotels", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_hotels(session):
+    for hotel_id in session.info.pop("changed_hotels", ()):
+        invalidate_hotel_status(hotel_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_hotels(session):
+    session.info.pop("changed_hotels", None)
+
+
+def is_hotel_active(hotel_id, db) -> bool:
+    active = hotel_status_cache.get(hotel_id)
+    if active is None:
+        active = db.query(Hotel.id).filter(Hotel.id == hotel_id).filter(Hotel.is_active == True).first() is not None
+        hotel_status_cache.set(hotel_id, active)
+    return active
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 def require_session(request: Request, db=Depends(get_db)):
     hotel_id = request.session.get("hotel_id")
@@ -20,10 +52,10 @@ def require_session(request: Request, db=Depends(get_db)):
     if not hotel_id:
         add_flash_message(request, "Faça login para acessar o painel", "warning")
         raise HTTPException(status_code=307, headers={"Location": "/auth"})
-    
-    if not db.query(Hotel).filter(Hotel.id == hotel_id).filter(Hotel.is_active == True).first():
+
+    if not is_hotel_active(hotel_id, db):
         request.session.clear()
         add_flash_message(request, "Seu hotel foi desativado, ou não existe mais. Caso necessário, entre em contato com o suporte.", "danger")
         raise HTTPException(status_code=307, headers={"Location": "/auth"})
-    
-    return {"id": hotel_id, "name": hotel_name}
\ No newline at end of file
+
+    return {"id": hotel_id, "name": hotel_name}
@@ -0,0 +1,293 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+from jinja2 import pass_context
+from markupsafe import Markup, escape
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+
+STATIC_DIRECTORIES = {
+    "static": "app/static/main",
+    "dashboard": "app/static/dashboard",
+}
+# variantes geradas (gzip, brotli, webp) ficam fora das pastas versionadas
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", "app/static/.build")
+# arquivos sem hash no nome (ex. imports relativos de módulos JS) sempre revalidam
+STATIC_DEFAULT_CACHE_CONTROL = os.getenv("STATIC_DEFAULT_CACHE_CONTROL", "no-cache")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+FINGERPRINT_LENGTH = 10
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".svg", ".json", ".map", ".html", ".txt", ".ico", ".ttf", ".eot", ".otf"}
+# só as imagens da página pública ganham variantes WebP redimensionadas
+WEBP_SOURCES = {"static": ("img/",)}
+WEBP_WIDTHS = (480, 960, 1600)
+WEBP_QUALITY = 80
+# códigos-fonte que não são servidos
+SKIP_DIRECTORIES = {"scss"}
+
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_FINGERPRINTED = re.compile(rf"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{FINGERPRINT_LENGTH}}})(?P<ext>\.[^./]+)$")
+
+static_mounts = {}
+
+
+def split_fingerprint(path: str):
+    """'css/style.0123456789.css' -> ('css/style.css', '0123456789'); unhashed paths return (path, None)."""
+    match = _FINGERPRINTED.match(path)
+    if not match:
+        return path, None
+    return match.group("stem") + match.group("ext"), match.group("hash")
+
+
+def _accepted_encodings(headers: Headers) -> set:
+    accepted = set()
+    for token in headers.get("accept-encoding", "").split(","):
+        name, _, params = token.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    return accepted
+
+
+class AssetManifest:
+    """Content hashes of a static directory, computed lazily and refreshed when a file changes."""
+
+    def __init__(self, name: str, directory: str, build_dir: str = STATIC_BUILD_DIR):
+        self.name = name
+        self.directory = directory
+        self.build_dir = os.path.join(build_dir, name)
+        self._hashes = {}
+        self._webp = None
+        self._lock = threading.Lock()
+
+    def source_path(self, path: str):
+        """File serving `path`: the static directory first, then the generated variants."""
+        for root in (self.directory, self.build_dir):
+            full_path = os.path.realpath(os.path.join(root, path))
+            if full_path.startswith(os.path.realpath(root) + os.sep) and os.path.isfile(full_path):
+                return full_path
+        return None
+
+    def fingerprint(self, path: str):
+        full_path = self.source_path(path)
+        if full_path is None:
+            return None
+        stat = os.stat(full_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+        digest = hashlib.sha256()
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()[:FINGERPRINT_LENGTH]
+        with self._lock:
+            self._hashes[path] = (key, value)
+        return value
+
+    def fingerprinted_path(self, path: str) -> str:
+        path = path.lstrip("/")
+        value = self.fingerprint(path)
+        if value is None:
+            return path
+        stem, ext = os.path.splitext(path)
+        return f"{stem}.{value}{ext}"
+
+    def webp_variants(self, path: str) -> list:
+        if self._webp is None:
+            try:
+                with open(os.path.join(self.build_dir, "manifest.json"), encoding="utf-8") as f:
+                    self._webp = json.load(f).get("webp", {})
+            except (OSError, ValueError):
+                self._webp = {}
+        return self._webp.get(path.lstrip("/"), [])
+
+    def encoded_variant(self, path: str, encoding_ext: str):
+        """Precompressed file for `path`, if built and not older than the source."""
+        source = self.source_path(path)
+        variant = os.path.join(self.build_dir, path + encoding_ext)
+        try:
+            if source and os.stat(variant).st_mtime_ns >= os.stat(source).st_mtime_ns:
+                return variant
+        except FileNotFoundError:
+            pass
+        return None
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles with hashed URLs, immutable caching and precompressed variants.
+
+    `css/style.<hash>.css` serves `css/style.css` with a one-year immutable
+    Cache-Control when the hash matches the current content. Unhashed (or stale) URLs
+    revalidate. A `.br`/`.gz` file built by `python -m app.utils.static_assets build`
+    is served when the client accepts that encoding.
+    """
+
+    def __init__(self, *, directory: str, name: str, build_dir: str = STATIC_BUILD_DIR, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.manifest = AssetManifest(name, directory, build_dir)
+        static_mounts[name] = self.manifest
+
+    async def get_response(self, path: str, scope):
+        stripped, fingerprint = split_fingerprint(path)
+        if fingerprint is not None and self.manifest.source_path(stripped) is not None:
+            path = stripped
+        else:
+            fingerprint = None
+        immutable = fingerprint is not None and fingerprint == self.manifest.fingerprint(path)
+        request_headers = Headers(scope=scope)
+
+        response = None
+        accepted = _accepted_encodings(request_headers)
+        for encoding, encoding_ext in ENCODINGS:
+            variant = encoding in accepted and self.manifest.encoded_variant(path, encoding_ext)
+            if variant:
+                response = self.file_response(variant, os.stat(variant), scope)
+                response.headers["Content-Encoding"] = encoding
+                break
+
+        if response is None:
+            try:
+                response = await super().get_response(path, scope)
+            except HTTPException as e:
+                # variantes WebP existem só na pasta de build
+                generated = self.manifest.source_path(path)
+                if e.status_code != 404 or generated is None:
+                    raise
+                response = self.file_response(generated, os.stat(generated), scope)
+
+        if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+            response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else STATIC_DEFAULT_CACHE_CONTROL
+        return response
+
+
+@pass_context
+def asset_url(context, mount: str, path: str) -> str:
+    """URL with the content hash of a static file, e.g. {{ asset_url('static', 'css/style.css') }}."""
+    request = context["request"]
+    manifest = static_mounts.get(mount)
+    if manifest is not None:
+        path = manifest.fingerprinted_path(path)
+    return str(request.url_for(mount, path=path.lstrip("/")))
+
+
+@pass_context
+def asset_picture(context, mount: str, path: str, sizes: str = "100vw", **attrs) -> Markup:
+    """<picture> with the built WebP widths of an image and the original as fallback."""
+    img_attrs = "".join(f' {escape(k.rstrip("_").replace("_", "-"))}="{escape(v)}"' for k, v in attrs.items())
+    img = Markup(f'<img src="{escape(asset_url(context, mount, path))}"{img_attrs}>')
+    manifest = static_mounts.get(mount)
+    variants = manifest.webp_variants(path) if manifest is not None else []
+    if not variants:
+        return img
+    srcset = ", ".join(f"{asset_url(context, mount, variant)} {width}w" for width, variant in variants)
+    return Markup(
+        f'<picture><source type="image/webp" srcset="{escape(srcset)}" sizes="{escape(sizes)}">{img}</picture>'
+    )
+
+
+def install_template_helpers(env):
+    env.globals["asset_url"] = asset_url
+    env.globals["asset_picture"] = asset_picture
+
+
+def _iter_files(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRECTORIES and not d.startswith(".")]
+        for file_name in files:
+            full_path = os.path.join(root, file_name)
+            yield os.path.relpath(full_path, directory).replace(os.sep, "/"), full_path
+
+
+def _write_if_smaller(target, data, original_size):
+    # variante que não economiza nada só custaria espaço
+    if len(data) >= original_size:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(data)
+    return True
+
+
+def build(name: str, directory: str, build_dir: str = STATIC_BUILD_DIR, webp: bool = True) -> dict:
+    """Write gzip/brotli variants of text assets and resized WebP copies of landing images."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    Image = None
+    if webp and name in WEBP_SOURCES:
+        try:
+            from PIL import Image
+        except ImportError:
+            print("Pillow não instalado: variantes WebP ignoradas", file=sys.stderr)
+
+    out_dir = os.path.join(build_dir, name)
+    stats = {"gzip": 0, "br": 0, "webp": 0}
+    webp_manifest = {}
+
+    for rel_path, full_path in _iter_files(directory):
+        ext = os.path.splitext(rel_path)[1].lower()
+        if ext in COMPRESSIBLE_EXTENSIONS:
+            with open(full_path, "rb") as f:
+                data = f.read()
+            if _write_if_smaller(os.path.join(out_dir, rel_path + ".gz"), gzip.compress(data, 9, mtime=0), len(data)):
+                stats["gzip"] += 1
+            if brotli is not None and _write_if_smaller(
+                os.path.join(out_dir, rel_path + ".br"), brotli.compress(data, quality=11), len(data)
+            ):
+                stats["br"] += 1
+
+        if Image is not None and ext in (".jpg", ".jpeg", ".png") and rel_path.startswith(WEBP_SOURCES[name]):
+            with Image.open(full_path) as image:
+                variants = []
+                stem = os.path.splitext(rel_path)[0]
+                for width in WEBP_WIDTHS:
+                    if width > image.width and variants:
+                        break
+                    target_width = min(width, image.width)
+                    resized = image.convert("RGB")
+                    if target_width < image.width:
+                        resized = resized.resize((target_width, round(image.height * target_width / image.width)), Image.LANCZOS)
+                    variant = f"{stem}-{target_width}w.webp"
+                    os.makedirs(os.path.dirname(os.path.join(out_dir, variant)), exist_ok=True)
+                    resized.save(os.path.join(out_dir, variant), "WEBP", quality=WEBP_QUALITY, method=6)
+                    variants.append([target_width, variant])
+                    stats["webp"] += 1
+                webp_manifest[rel_path] = variants
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"webp": webp_manifest}, f, indent=2, sort_keys=True)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.utils.static_assets",
+        description="Gera as variantes comprimidas (gzip/brotli) e WebP dos arquivos estáticos.",
+    )
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--no-webp", action="store_true", help="não gera as imagens WebP")
+    args = parser.parse_args(argv)
+
+    for name, directory in STATIC_DIRECTORIES.items():
+        stats = build(name, directory, webp=not args.no_webp)
+        print(f"{name}: {stats['gzip']} gzip, {stats['br']} brotli, {stats['webp']} webp")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
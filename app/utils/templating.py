@@ -0,0 +1,63 @@
+import logging
+import os
+import time
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateError
+
+from app.utils.private_paths import private_dir
+from app.utils.profiling import ProfiledTemplate
+from app.utils.static_assets import install_template_helpers
+
+logger = logging.getLogger("roomcontrol.templates")
+
+TEMPLATE_DIR = "app/templates"
+# em produção desligue: os templates só mudam no deploy e cada render deixa de checar o mtime
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() in ("1", "true", "yes")
+# bytecode compilado compartilhado entre workers e reinícios
+TEMPLATE_BYTECODE_CACHE = os.getenv("TEMPLATE_BYTECODE_CACHE", "true").lower() in ("1", "true", "yes")
+# vazio usa o diretório padrão do Jinja (por usuário, 0700, com checagem do dono)
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", "")
+
+
+def _bytecode_cache():
+    if not TEMPLATE_BYTECODE_CACHE:
+        return None
+    if not TEMPLATE_CACHE_DIR:
+        return FileSystemBytecodeCache()
+    # o bytecode do diretório é executado: só um diretório do próprio usuário, fechado aos outros
+    return FileSystemBytecodeCache(private_dir(TEMPLATE_CACHE_DIR))
+
+
+def create_environment() -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=_bytecode_cache(),
+        # todos os templates cabem na memória; sem descarte por LRU
+        cache_size=-1,
+    )
+    # tempo de renderização entra no Server-Timing das requisições perfiladas
+    env.template_class = ProfiledTemplate
+    install_template_helpers(env)
+    return env
+
+
+# ambiente único usado por todos os routers
+templates = Jinja2Templates(env=create_environment())
+
+
+def warm_templates() -> int:
+    """Compile every template ahead of the first request; returns how many loaded."""
+    env = templates.env
+    start = time.perf_counter()
+    loaded = 0
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+            loaded += 1
+        except TemplateError:
+            logger.exception("Falha ao compilar o template %s", name)
+    logger.info("%d templates compilados em %.0f ms", loaded, (time.perf_counter() - start) * 1000)
+    return loaded
@@ -0,0 +1,14 @@
+import re
+import unicodedata
+
+
+def normalize_text(s: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", s.lower()).split())
+
+
+def tokenize(s: str) -> list[str]:
+    """Split a search string into normalized tokens."""
+    return normalize_text(s).split()
@@ -0,0 +1,352 @@
+"""Latency and queries per request of the main endpoints, against a seeded throwaway database.
+
+Usage: python -m benchmarks.bench_endpoints [--hotels 2] [--rooms 50] [--guests 500]
+       [--reservations 5000] [--requests 50] [--seed 42] [--database-url URL]
+       [--output FILE] [--compare BASELINE.json] [--threshold 0.2]
+
+The app runs in-process (TestClient) against a temporary SQLite file by default. SQLite
+does not cover the MySQL-only paths (FULLTEXT guest search, scheduler lock); for those
+pass --database-url with an EMPTY, disposable MySQL database. Results are written as JSON;
+--compare exits with status 1 when a p95 got slower than the baseline by more than
+--threshold.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BATCH_SIZE = 1000
+# diferenças menores que isso são ruído, mesmo que passem do limite relativo
+NOISE_FLOOR_MS = 1.0
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "Yuri"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Araújo", "Barbosa", "Conceição", "Melo"]
+
+
+def _configure_environment(database_url: str):
+    # precisa vir antes de importar o app: config.py e os serviços leem o ambiente no import
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ["SESSION_BACKEND"] = "memory"
+    os.environ["BROADCAST_BACKEND"] = "memory"
+    os.environ["CNPJ_WS_BACKEND"] = "stub"
+
+
+def _insert(conn, table, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        conn.execute(table.insert(), rows[i:i + BATCH_SIZE])
+
+
+def _cpf(n: int) -> str:
+    digits = f"{n:011d}"
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def seed(engine, hotels: int, rooms: int, guests: int, reservations: int, rng: random.Random) -> dict:
+    """Insert the volumes per hotel with Core inserts; returns ids used to build the requests."""
+    from app.models.hotel import Hotel
+    from app.models.rooms import Rooms
+    from app.models.guest import Guest
+    from app.models.reservations import Reservations
+    from app.utils.text_search import normalize_text
+
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    sample = {"hotels": [], "rooms": [], "guests": [], "reservations": []}
+    room_id = guest_id = reservation_id = 0
+
+    with engine.begin() as conn:
+        for h in range(1, hotels + 1):
+            _insert(conn, Hotel.__table__, [{
+                "id": h, "name": f"Hotel {h}", "login": f"hotel{h}", "password": "-",
+                "address": f"Rua {h}, 100", "city": "São Paulo", "state": "SP", "zip_code": "01000-000",
+                "phone_number": f"(11) 3000-{h:04d}", "email": f"hotel{h}@example.com",
+                "cnpj": f"{h:014d}", "is_active": True,
+            }])
+            sample["hotels"].append(h)
+
+            guest_rows = []
+            for _ in range(guests):
+                guest_id += 1
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+                cpf = _cpf(guest_id)
+                guest_rows.append({
+                    "id": guest_id, "name": name, "cpf": cpf, "cpf_digits": cpf.replace(".", "").replace("-", ""),
+                    "name_search": normalize_text(name), "hotel_id": h, "is_deleted": False,
+                    "email": f"hospede{guest_id}@example.com",
+                })
+            _insert(conn, Guest.__table__, guest_rows)
+            hotel_guests = [g["id"] for g in guest_rows]
+
+            # histórico sem sobreposição por quarto, ~70% no passado
+            per_room = max(1, reservations // max(rooms, 1))
+            room_rows, reservation_rows = [], []
+            for r in range(rooms):
+                room_id += 1
+                room_type = str(rng.randint(1, 9))
+                status = "maintenance" if rng.random() < 0.05 else "available"
+                cursor = now - datetime.timedelta(days=int(per_room * 5.5 * 0.7))
+                for _ in range(per_room):
+                    cursor += datetime.timedelta(days=rng.randint(0, 3))
+                    check_in = cursor.replace(hour=14)
+                    check_out = (check_in + datetime.timedelta(days=rng.randint(1, 7))).replace(hour=12)
+                    cursor = check_out
+                    if check_out <= now:
+                        res_status = "canceled" if rng.random() < 0.1 else "checked_out"
+                    elif check_in <= now:
+                        res_status = "checked_in"
+                        status = "occupied"
+                    else:
+                        res_status = "canceled" if rng.random() < 0.05 else "booked"
+                    reservation_id += 1
+                    reservation_rows.append({
+                        "id": reservation_id, "guest_id": rng.choice(hotel_guests), "room_id": room_id, "hotel_id": h,
+                        "check_in": check_in, "check_out": check_out, "status": res_status,
+                    })
+                room_rows.append({
+                    "id": room_id, "hotel_id": h, "room_number": str(100 + r), "type": room_type,
+                    "capacity_adults": 2, "capacity_children": 1, "capacity_total": 3,
+                    "price": float(rng.randint(120, 600)), "status": status, "is_active": True,
+                })
+            _insert(conn, Rooms.__table__, room_rows)
+            _insert(conn, Reservations.__table__, reservation_rows)
+
+            # as páginas são medidas com a sessão do hotel 1
+            if h == 1:
+                sample["rooms"] = [row["id"] for row in room_rows[:20]]
+                sample["guests"] = hotel_guests[:20]
+                sample["reservations"] = [row["id"] for row in reservation_rows[::max(1, len(reservation_rows) // 20)]]
+
+    _seed_rollup(engine, sample["hotels"])
+    return sample
+
+
+def _seed_rollup(engine, hotel_ids):
+    # carrega a ocupação diária com insert simples, sem o upsert específico do MySQL
+    from sqlalchemy.orm import Session
+    from app.models.daily_occupancy import DailyOccupancy
+    from app.helpers.reports.daily_occupancy import compute_rollup
+
+    with Session(engine) as db:
+        for hotel_id in hotel_ids:
+            rows = [
+                {"hotel_id": key[0], "date": key[1], "room_type": key[2],
+                 "occupied": value[0], "booked": value[1], "revenue": value[2]}
+                for key, value in compute_rollup(db, hotel_id).items()
+            ]
+            _insert(db.connection(), DailyOccupancy.__table__, rows)
+        db.commit()
+
+
+def _endpoints(sample: dict, is_mysql: bool):
+    hotel_id = sample["hotels"][0]
+    pick = lambda items, i: items[i % len(items)]
+    day = datetime.date.today() + datetime.timedelta(days=3)
+    check_in = f"{day}T14:00"
+    check_out = f"{day + datetime.timedelta(days=2)}T12:00"
+
+    endpoints = [
+        ("dashboard", lambda i: "/dashboard"),
+        ("reservations_page", lambda i: "/dashboard_reservations"),
+        ("reservations_page_filtered", lambda i: "/dashboard_reservations?status=booked"),
+        ("reservations_table", lambda i: "/dashboard_reservations/table?status=checked_in"),
+        ("check_availability", lambda i: f"/dashboard_reservations/check_availability?check_in={check_in}&check_out={check_out}"),
+        ("manage_reservation", lambda i: f"/dashboard_reservations/manage/{pick(sample['reservations'], i)}"),
+        ("guests_page", lambda i: "/dashboard_guests"),
+        ("rooms_page", lambda i: "/dashboard_rooms"),
+        ("rooms_table", lambda i: "/dashboard_rooms/table?available=on"),
+        ("reports_data", lambda i: "/dashboard_reports/data"),
+        ("api_get_hotels", lambda i: "/api/get_hotels"),
+        ("api_get_rooms", lambda i: f"/api/get_rooms?hotel_id={hotel_id}"),
+        ("api_get_guests", lambda i: f"/api/get_guests?hotel_id={hotel_id}"),
+        ("api_get_reservations", lambda i: f"/api/get_reservations?room_id={pick(sample['rooms'], i)}"),
+        ("api_dashboard_kpis", lambda i: "/api/dashboard_kpis"),
+        ("api_cache_stats", lambda i: "/api/cache_stats"),
+    ]
+    if is_mysql:
+        # MATCH ... AGAINST só existe no MySQL
+        endpoints.append(("api_get_guests_search", lambda i: f"/api/get_guests?hotel_id={hotel_id}&guest_name={pick(LAST_NAMES, i)}"))
+    return endpoints
+
+
+def _percentile(sorted_values, p):
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def measure(client, counter, path_for, requests: int, warmup: int = 3) -> dict:
+    """Latency percentiles of one endpoint; respostas 5xx marcam o endpoint como falho."""
+    for i in range(warmup):
+        client.get(path_for(i))
+
+    latencies, queries, sizes, statuses = [], [], [], {}
+    for i in range(requests):
+        counter.count = 0
+        start = time.perf_counter()
+        response = client.get(path_for(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        sizes.append(len(response.content))
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status.startswith("5"))
+    return {
+        "path": path_for(0),
+        "failed": errors > 0,
+        "requests": requests,
+        "status": statuses,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p90_ms": round(_percentile(latencies, 90), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "min_ms": round(latencies[0], 3),
+        "max_ms": round(latencies[-1], 3),
+        "queries_avg": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+        "bytes_avg": round(sum(sizes) / len(sizes)),
+    }
+
+
+class QueryCounter:
+    """Counts the statements sent by the engine (reset before each request)."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Endpoints whose p95 regressed beyond `threshold`, as (name, old_ms, new_ms)."""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        # endpoint que falhou em algum dos lados não tem latência comparável
+        if previous is None or previous.get("failed") or current.get("failed"):
+            continue
+        old, new = previous["p95_ms"], current["p95_ms"]
+        marker = ""
+        if new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+            regressions.append((name, old, new))
+            marker = "  <-- regressão"
+        print(f"{name:>28}: p95 {old:8.2f} -> {new:8.2f} ms{marker}")
+    return regressions
+
+
+def run(args) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from app.core.config import Base, engine
+    from app.main import app
+    from app.services.sessions import session_store
+
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM hotels")).scalar():
+            raise SystemExit("O banco informado já tem dados: use um banco vazio e descartável.")
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    sample = seed(engine, args.hotels, args.rooms, args.guests, args.reservations, rng)
+    print(f"Banco populado em {time.perf_counter() - started:.1f}s")
+
+    counter = QueryCounter(engine)
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "seed": args.seed,
+            "volumes": {"hotels": args.hotels, "rooms": args.rooms, "guests": args.guests, "reservations": args.reservations},
+        },
+        "endpoints": {},
+    }
+
+    # erros do servidor viram respostas 500 e ficam registrados no endpoint, sem abortar a rodada
+    with TestClient(app, follow_redirects=False, raise_server_exceptions=False) as client:
+        # sessão já autenticada no hotel 1, sem passar pelo bcrypt do login
+        session_id = "benchmark"
+        session_store.save(session_id, json.dumps({"hotel_id": 1, "hotel_name": "Hotel 1"}), time.time() + 3600)
+        client.cookies.set("session", session_id)
+
+        for name, path_for in _endpoints(sample, engine.dialect.name == "mysql"):
+            stats = measure(client, counter, path_for, args.requests)
+            results["endpoints"][name] = stats
+            print(f"{name:>28}: p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f} ms  "
+                  f"{stats['queries_avg']:5.1f} queries  status {stats['status']}"
+                  + ("  <-- falhou" if stats["failed"] else ""))
+    engine.dispose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_endpoints", description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=2)
+    parser.add_argument("--rooms", type=int, default=50, help="quartos por hotel")
+    parser.add_argument("--guests", type=int, default=500, help="hóspedes por hotel")
+    parser.add_argument("--reservations", type=int, default=5000, help="reservas por hotel")
+    parser.add_argument("--requests", type=int, default=50, help="requisições medidas por endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="banco vazio e descartável (padrão: SQLite temporário)")
+    parser.add_argument("--output", help="arquivo JSON de resultado (padrão: benchmarks/results/)")
+    parser.add_argument("--compare", help="resultado anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada no p95")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.mkdtemp(prefix="roomcontrol-bench-")
+        args.database_url = f"sqlite:///{os.path.join(temp_dir, 'bench.sqlite3')}"
+    _configure_environment(args.database_url)
+
+    try:
+        results = run(args)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"endpoints-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados em {output}")
+
+    failed = [name for name, stats in results["endpoints"].items() if stats["failed"]]
+    if failed:
+        print(f"Endpoints com erro do servidor: {', '.join(failed)}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} endpoint(s) acima do limite de {args.threshold:.0%}")
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
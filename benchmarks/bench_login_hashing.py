@@ -0,0 +1,48 @@
+"""Concurrent login throughput: bcrypt on the event loop vs. the hash pool.
+
+Usage: python -m benchmarks.bench_login_hashing [concurrency] [rounds]
+"""
+import asyncio
+import sys
+import time
+
+from app.core import security
+
+
+async def _inline_login(password, hashed):
+    # comportamento antigo: verify síncrono dentro da coroutine
+    return security.verify_password(password, hashed)
+
+
+async def _pooled_login(password, hashed):
+    ok, _ = await security.verify_and_update_password_async(password, hashed)
+    return ok
+
+
+async def _run(login, concurrency, password, hashed):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login(password, hashed) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return elapsed
+
+
+async def main(concurrency: int, rounds: int):
+    password = "senha-de-teste"
+    hashed = security.pwd_context.hash(password)
+
+    # aquece o pool para não medir a criação dos processos
+    await _pooled_login(password, hashed)
+
+    for name, login in (("inline", _inline_login), ("pool", _pooled_login)):
+        times = [await _run(login, concurrency, password, hashed) for _ in range(rounds)]
+        best = min(times)
+        print(f"{name:>6}: {concurrency} logins em {best:.3f}s -> {concurrency / best:.1f} logins/s")
+
+    security.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    asyncio.run(main(concurrency, rounds))